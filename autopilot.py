@@ -1,25 +1,1693 @@
 #!/usr/bin/env python3
-import cv2
-import numpy as np
-from moviepy.editor import *
+import importlib
 import os
+import subprocess
 import json
+import argparse
+import hashlib
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import random
 from datetime import datetime, timedelta
 import math
+import sqlite3
 import sys
+import threading
+import time
+import wave
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 # Configure MoviePy
 os.environ['IMAGEIO_FFMPEG_EXE'] = '/usr/bin/ffmpeg'
 
-class ViralLegalShortsSystem:
+class LazyModule:
+    """Stand-in for a heavy module that is imported on first attribute access"""
+
+    def __init__(self, name):
+        self._lazy_name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._lazy_name)
+        # Copy the namespace so later lookups never reach __getattr__ again
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+# NumPy and OpenCV load when rendering starts, so CLI modes that never
+# touch a frame (marketing, listings, cache info) start in milliseconds.
+# MoviePy is imported inside the few methods that build clips.
+np = LazyModule('numpy')
+cv2 = LazyModule('cv2')
+
+# Renderer layouts (positions, sizes, fonts) are authored for a frame this wide
+REFERENCE_WIDTH = 1080
+
+def layout_scale(width):
+    """Factor from reference-layout pixels to a frame of this width"""
+    return width / REFERENCE_WIDTH
+
+def scaled_px(value, scale, minimum=1):
+    """A reference-layout length in pixels at scale, never below minimum"""
+    return max(minimum, int(round(value * scale)))
+
+def fill_row_colors(frame, colors):
+    """Fill every row of frame with its per-row color"""
+    # Broadcasting a 3-channel color across rows is slow in NumPy, so write the
+    # first pixel column and keep doubling the filled span along each row
+    rows = frame.reshape(frame.shape[0], -1)
+    rows[:, :3] = colors
+    filled, total = 3, rows.shape[1]
+    while filled < total:
+        span = min(filled, total - filled)
+        rows[:, filled:filled + span] = rows[:, :span]
+        filled += span
+    return frame
+
+def crop_sprite(canvas, alpha):
+    """Crop a drawing made on black to its alpha box as (straight RGBA, x, y)"""
+    ys, xs = np.nonzero(alpha)
+    if not len(ys):
+        return None
+
+    y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+    crop_alpha = alpha[y0:y1, x0:x1]
+
+    # Antialiasing against black premultiplied the colors, undo that
+    crop_rgb = canvas[y0:y1, x0:x1].astype(np.uint32) * 255
+    coverage = np.maximum(crop_alpha, 1).astype(np.uint32)[:, :, np.newaxis]
+    crop_rgb = np.minimum(crop_rgb // coverage, 255).astype(np.uint8)
+
+    return np.dstack([crop_rgb, crop_alpha]), int(x0), int(y0)
+
+def prepare_blend(rgba):
+    """Precompute the uint16 sprite terms of out = (bg * (255 - a) + rgb * a) / 255"""
+    # Both terms sum to at most 255 * 255, so the blend never leaves uint16
+    alpha = rgba[:, :, 3:].astype(np.uint16)
+    premultiplied = rgba[:, :, :3].astype(np.uint16) * alpha + 127
+    inverse = np.repeat(255 - alpha, 3, axis=2)
+    return premultiplied, inverse
+
+def thread_scratch(local, name, make):
+    """Scratch value of the calling thread, created by make() on first use"""
+    # Renderers are shared by frame producer threads, their scratch arrays are not
+    value = getattr(local, name, None)
+    if value is None:
+        value = make()
+        setattr(local, name, value)
+    return value
+
+def blend_into(region, premultiplied, inverse, work):
+    """Alpha-blend a prepared sprite over region in place"""
+    np.multiply(region, inverse, out=work)
+    work += premultiplied
+    work //= 255
+    np.copyto(region, work, casting='unsafe')
+
+def peak_rss_mb(who='self'):
+    """Peak resident set size of this process (or its reaped children) in MB"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN)
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024  # bytes on macOS, KB on Linux
+    peak = usage.ru_maxrss / divisor
+    if who == 'self':
+        # Stage resets lower ru_maxrss too, the highest mark they cleared still counts
+        peak = max(peak, STAGE_RSS.cleared_mb)
+    return round(peak, 1)
+
+def children_cpu_seconds():
+    """CPU time used by reaped child processes (ffmpeg, pool workers)"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+class ProfileCollector:
+    """cProfile data of worker threads, which the main thread's profile never sees, for --profile"""
+
     def __init__(self):
+        self.profiles = []
+        self.lock = threading.Lock()
+
+    def wrap(self, target):
+        """Return target running under its own cProfile, kept for the merged dump"""
+        def profiled(*args, **kwargs):
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self.lock:
+                    self.profiles.append(profile)
+        return profiled
+
+    def add_dump(self, path):
+        """Take in a .prof dumped by a pool worker"""
+        import pstats
+        with self.lock:
+            self.profiles.append(pstats.Stats(path))
+        os.remove(path)
+
+    def merged(self, profile):
+        """pstats.Stats of profile plus every collected worker profile"""
+        import pstats
+        stats = pstats.Stats(profile)
+        with self.lock:
+            for worker_profile in self.profiles:
+                stats.add(worker_profile)
+        return stats
+
+class StagePeakRss:
+    """Peak RSS of one stage from Linux's resettable VmHWM, or the process peak elsewhere"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cleared_mb = 0.0  # Highest VmHWM wiped by a reset
+        self.resettable = os.path.exists('/proc/self/clear_refs')
+
+    @staticmethod
+    def hwm_mb():
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+
+    def reset(self):
+        """Restart the high-water mark at the current RSS"""
+        if not self.resettable:
+            return
+        with self.lock:
+            self.cleared_mb = max(self.cleared_mb, self.hwm_mb() or 0.0)
+            try:
+                with open('/proc/self/clear_refs', 'w') as f:
+                    f.write('5')
+            except OSError:
+                self.resettable = False
+
+    def peak_mb(self):
+        """Peak RSS since the last reset; stages overlapping on other threads share it"""
+        hwm = self.hwm_mb() if self.resettable else None
+        return round(hwm, 1) if hwm is not None else peak_rss_mb()
+
+STAGE_RSS = StagePeakRss()
+
+class StageProfiler:
+    """Wall time, CPU time and peak RSS per pipeline stage, plus per-frame latency histograms"""
+
+    # Upper bounds (ms) of the frame latency histogram buckets
+    FRAME_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.frames = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as a pipeline stage"""
+        STAGE_RSS.reset()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        child_cpu = children_cpu_seconds()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu,
+                     children_cpu_seconds() - child_cpu, STAGE_RSS.peak_mb())
+
+    def add(self, name, wall, cpu, child_cpu=0.0, peak_mb=None):
+        """Accumulate time into a stage, keeping the highest peak RSS it reached"""
+        peak_mb = STAGE_RSS.peak_mb() if peak_mb is None else peak_mb
+        with self.lock:
+            stage = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'child_cpu_seconds': 0.0})
+            stage['wall_seconds'] += wall
+            stage['cpu_seconds'] += cpu
+            stage['child_cpu_seconds'] += child_cpu
+            stage['peak_rss_mb'] = max(stage.get('peak_rss_mb') or 0.0, peak_mb or 0.0)
+
+    def wrap_frames(self, name, make_frame):
+        """Return make_frame recording each call's latency under name"""
+        def timed_make_frame(t, *args, **kwargs):
+            start = time.perf_counter()
+            cpu = time.thread_time()
+            frame = make_frame(t, *args, **kwargs)
+            self.record_frame(name, time.perf_counter() - start, time.thread_time() - cpu)
+            return frame
+        return timed_make_frame
+
+    def record_frame(self, name, seconds, cpu=0.0):
+        """Add one frame latency to a generator's histogram"""
+        ms = seconds * 1000
+        with self.lock:
+            stats = self.frames.get(name)
+            if stats is None:
+                stats = self.frames[name] = {
+                    'frames': 0, 'total_ms': 0.0, 'cpu_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(self.FRAME_BUCKETS_MS) + 1)
+                }
+            stats['frames'] += 1
+            stats['total_ms'] += ms
+            stats['cpu_ms'] += cpu * 1000
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            bucket = 0
+            while bucket < len(self.FRAME_BUCKETS_MS) and ms > self.FRAME_BUCKETS_MS[bucket]:
+                bucket += 1
+            stats['buckets'][bucket] += 1
+
+    def frame_seconds(self, *names):
+        """Total (wall, cpu) seconds spent in the named frame generators"""
+        with self.lock:
+            stats = [self.frames[name] for name in names if name in self.frames]
+            return (sum(s['total_ms'] for s in stats) / 1000, sum(s['cpu_ms'] for s in stats) / 1000)
+
+    def merge(self, report):
+        """Fold in a report from another profiler (e.g. a pool worker)"""
+        for name, stage in report.get('stages', {}).items():
+            self.add(name, stage['wall_seconds'], stage['cpu_seconds'], stage['child_cpu_seconds'],
+                     stage.get('peak_rss_mb'))
+        with self.lock:
+            for name, other in report.get('frames', {}).items():
+                stats = self.frames.setdefault(name, {
+                    'frames': 0, 'total_ms': 0.0, 'cpu_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(self.FRAME_BUCKETS_MS) + 1)
+                })
+                stats['frames'] += other['frames']
+                stats['total_ms'] += other['total_ms']
+                stats['cpu_ms'] += other['cpu_ms']
+                stats['max_ms'] = max(stats['max_ms'], other['max_ms'])
+                stats['buckets'] = [a + b for a, b in zip(stats['buckets'], other['histogram'].values())]
+
+    def report(self):
+        """JSON-friendly summary of stages and frame histograms"""
+        labels = [f"<={bound}ms" for bound in self.FRAME_BUCKETS_MS] + [f">{self.FRAME_BUCKETS_MS[-1]}ms"]
+        with self.lock:
+            stages = {name: {key: round(value, 4) if isinstance(value, float) else value
+                             for key, value in stage.items()}
+                      for name, stage in self.stages.items()}
+            frames = {name: {
+                'frames': stats['frames'],
+                'total_ms': round(stats['total_ms'], 3),
+                'cpu_ms': round(stats['cpu_ms'], 3),
+                'mean_ms': round(stats['total_ms'] / max(stats['frames'], 1), 3),
+                'max_ms': round(stats['max_ms'], 3),
+                'histogram': dict(zip(labels, stats['buckets']))
+            } for name, stats in self.frames.items()}
+        return {
+            'stages': stages,
+            'frames': frames,
+            'peak_rss_mb': peak_rss_mb(),
+            'children_peak_rss_mb': peak_rss_mb('children')
+        }
+
+# Bump whenever a change alters rendered pixels or audio, to invalidate caches
+RENDERER_VERSION = 2
+
+# Layers of a render and the inputs each is built from. A layer's cache key covers
+# only these, so editing one input re-renders just the layers downstream of it.
+# Every cache key (segments, narration WAVs, rendered videos) is derived from here
+RENDER_LAYERS = OrderedDict([
+    ('background', ('theme', 'render_config')),
+    ('title_card', ('title', 'render_config')),
+    ('captions', ('script', 'render_config')),
+    ('narration', ('script', 'duration', 'sample_rate')),
+    ('final', ('background', 'title_card', 'captions', 'narration')),
+    ('marketing', ('topic', 'title', 'key_facts')),
+])
+
+# Narration is synthesized at this rate whatever the video settings
+NARRATION_SAMPLE_RATE = 44100
+
+def evict_lru(directories, max_bytes, name_filter=None):
+    """Delete the least recently used matching files in directories until they fit max_bytes"""
+    entries = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file() and (name_filter is None or name_filter(entry.name)):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed.append(path)
+    return removed
+
+class RenderCache:
+    """Content-addressed, size-bounded LRU cache of renders under output/"""
+
+    # Settings that change how a render is produced but not what it contains
+    OUTPUT_NEUTRAL_CONFIG = ('frame_cache_mb', 'render_cache_mb', 'audio_cache_mb', 'workers', 'render_threads',
+                             'ring_buffers', 'preview_scale', 'preview_fps', 'retention_days',
+                             'intermediate_retention_days', 'run_log_mb', 'run_log_backups')
+
+    def __init__(self, output_dir, managed_dirs, max_mb=4096):
+        self.cache_dir = os.path.join(output_dir, "cache")
+        self.segment_dir = os.path.join(self.cache_dir, "segments")
+        self.managed_dirs = list(managed_dirs) + [self.segment_dir]
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.building_paths = {}  # path -> [lock, waiters] while some job builds it
+        os.makedirs(self.segment_dir, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def digest(*parts):
+        """Stable short hash of JSON-serialisable inputs and the renderer version"""
+        payload = json.dumps([RENDERER_VERSION] + list(parts), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def render_config(cls, video_config):
+        """The part of video_config that affects rendered output"""
+        return {k: v for k, v in video_config.items() if k not in cls.OUTPUT_NEUTRAL_CONFIG}
+
+    def hit(self, *paths):
+        """True if every path exists, marking them as recently used"""
+        if not self.enabled or not all(os.path.exists(path) for path in paths):
+            return False
+        for path in paths:
+            os.utime(path)
+        return True
+
+    @contextmanager
+    def building(self, path):
+        """Hold the build of one cached file, yielding True if another job finished it meanwhile"""
+        with self.lock:
+            entry = self.building_paths.setdefault(path, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield self.hit(path)
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.building_paths[path]
+
+    def evict(self):
+        """Delete least recently used files until the managed dirs fit the size cap"""
+        if not self.enabled:
+            return []
+        with self.lock:
+            return evict_lru(self.managed_dirs, self.max_bytes)
+
+def render_layer_keys(inputs):
+    """Cache key of each RENDER_LAYERS layer whose inputs are given, from only those inputs"""
+    keys = {}
+    for layer, sources in RENDER_LAYERS.items():
+        if all(source in keys or source in inputs for source in sources):
+            keys[layer] = RenderCache.digest(layer, [keys[source] if source in keys else inputs[source]
+                                                     for source in sources])
+    return keys
+
+class FrameCache:
+    """Memory-capped LRU store for rendered frames shared across clips"""
+
+    def __init__(self, max_mb=512):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.used_bytes = 0
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached frame for key or None"""
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key, frame):
+        """Store a read-only copy of frame, evicting frames of other clips if needed"""
+        if frame.nbytes > self.max_bytes:
+            return False
+
+        with self.lock:
+            if key in self.frames:
+                return True
+
+            # Keys are (clip..., frame index): evict other clips first, but never
+            # thrash the cycle currently being filled once the cap is reached
+            while self.used_bytes + frame.nbytes > self.max_bytes:
+                oldest_key = next(iter(self.frames))
+                if oldest_key[:-1] == key[:-1]:
+                    return False
+                self.used_bytes -= self.frames.pop(oldest_key).nbytes
+
+            cached = frame.copy()
+            cached.flags.writeable = False
+            self.frames[key] = cached
+            self.used_bytes += cached.nbytes
+            return True
+
+    def stats(self):
+        """Cache occupancy and hit counters"""
+        return {
+            'frames': len(self.frames),
+            'used_mb': round(self.used_bytes / (1024 * 1024), 1),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+class AudioCache:
+    """Narration PCM kept in a memory LRU and as content-addressed WAVs, both capped by size"""
+
+    def __init__(self, audio_dir, max_mb=256, memory_mb=64):
+        self.audio_dir = audio_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.memory_bytes = int(memory_mb * 1024 * 1024)
+        self.used_bytes = 0
+        self.entries = OrderedDict()  # key -> (read-only pcm, sample rate)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(script, duration, sample_rate=NARRATION_SAMPLE_RATE):
+        """The narration layer key, so cached WAVs follow RENDER_LAYERS"""
+        return render_layer_keys({'script': script, 'duration': duration, 'sample_rate': sample_rate})['narration']
+
+    def path(self, key):
+        return os.path.join(self.audio_dir, f"narration_{key}.wav")
+
+    def get(self, key):
+        """(pcm, sample_rate) from memory or disk, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self.read(key) if self.max_bytes > 0 else None
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self.remember(key, *entry)
+        return entry
+
+    def put(self, key, pcm, sample_rate):
+        """Keep pcm in memory and write it to disk for later runs"""
+        pcm = self.remember(key, pcm, sample_rate)
+        path = self.path(key)
+        if self.max_bytes > 0 and not os.path.exists(path):
+            # Batch threads may synthesize the same narration, so each writes its own temp file
+            fd, partial_path = tempfile.mkstemp(suffix='.wav.partial', dir=self.audio_dir)
+            try:
+                with os.fdopen(fd, 'wb') as raw, wave.open(raw, 'wb') as f:
+                    f.setnchannels(1)
+                    f.setsampwidth(2)
+                    f.setframerate(sample_rate)
+                    f.writeframes(pcm.astype('<i2', copy=False).tobytes())
+                os.replace(partial_path, path)
+            except BaseException:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
+            self.evict()
+        return pcm
+
+    def remember(self, key, pcm, sample_rate):
+        """Add a read-only entry to the memory LRU"""
+        if not pcm.flags.writeable:
+            cached = pcm
+        else:
+            cached = pcm.copy()
+            cached.flags.writeable = False
+        with self.lock:
+            if key not in self.entries and cached.nbytes <= self.memory_bytes:
+                while self.used_bytes + cached.nbytes > self.memory_bytes:
+                    self.used_bytes -= self.entries.popitem(last=False)[1][0].nbytes
+                self.entries[key] = (cached, sample_rate)
+                self.used_bytes += cached.nbytes
+        return cached
+
+    def read(self, key):
+        """Load a cached WAV, marking it recently used"""
+        path = self.path(key)
+        try:
+            with wave.open(path, 'rb') as f:
+                if f.getnchannels() != 1 or f.getsampwidth() != 2:
+                    return None
+                sample_rate = f.getframerate()
+                pcm = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2').astype(np.int16, copy=False)
+        except (FileNotFoundError, EOFError, wave.Error):
+            return None
+        os.utime(path)
+        return pcm, sample_rate
+
+    def evict(self):
+        """Delete least recently used WAVs until the audio dir fits the size cap"""
+        with self.lock:
+            return evict_lru([self.audio_dir], self.max_bytes,
+                             lambda name: name.startswith('narration_') and name.endswith('.wav'))
+
+    def stats(self):
+        """Cache occupancy and hit counters"""
+        return {
+            'entries': len(self.entries),
+            'used_mb': round(self.used_bytes / (1024 * 1024), 1),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses
+        }
+
+class RetentionManager:
+    """Rotating run log, append-only artifact index and age-based pruning of output/ and logs/"""
+
+    # Per-run files written by earlier versions, folded into runs.jsonl by compact_legacy_logs
+    LEGACY_LOGS = (('success_log_', 'video'), ('error_log_', 'error'), ('batch_manifest_', 'batch'))
+
+    def __init__(self, output_dir, logs_dir, log_mb=10, log_backups=5):
+        self.output_dir = output_dir
+        self.logs_dir = logs_dir
+        self.run_log_path = os.path.join(logs_dir, "runs.jsonl")
+        self.index_path = os.path.join(output_dir, "artifacts.jsonl")
+        self.max_log_bytes = int(log_mb * 1024 * 1024)
+        self.log_backups = log_backups
+        self.lock = threading.Lock()
+        self.entries = None  # render_key -> entry, replayed from artifacts.jsonl on first use
+
+    def log_run(self, kind, entry):
+        """Append one run to logs/runs.jsonl, rotating the file once it passes the size cap"""
+        line = json.dumps({'type': kind, **entry}, default=str) + '\n'
+        with self.lock:
+            try:
+                size = os.path.getsize(self.run_log_path)
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(line) > self.max_log_bytes:
+                self.rotate()
+            with open(self.run_log_path, 'a') as f:
+                f.write(line)
+        return self.run_log_path
+
+    def rotate(self):
+        """Shift runs.jsonl to runs.jsonl.1, .1 to .2 and so on, dropping the oldest"""
+        if self.log_backups <= 0:
+            os.remove(self.run_log_path)
+            return
+        for n in range(self.log_backups - 1, 0, -1):
+            older = f"{self.run_log_path}.{n}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.run_log_path}.{n + 1}")
+        os.replace(self.run_log_path, self.run_log_path + '.1')
+
+    def load(self):
+        """The artifact index, latest line per render key winning"""
+        if self.entries is None:
+            entries = {}
+            try:
+                with open(self.index_path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # Torn last line of an interrupted run
+                        if entry.get('removed'):
+                            entries.pop(entry['render_key'], None)
+                        else:
+                            entries[entry['render_key']] = entry
+            except FileNotFoundError:
+                pass
+            self.entries = entries
+        return self.entries
+
+    def append(self, entry):
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def record(self, render_key, topic, variation, **paths):
+        """Index the files of one render, or refresh its last-used time on a cache hit"""
+        now = time.time()
+        files = {kind: path for kind, path in paths.items() if path and os.path.exists(path)}
+        with self.lock:
+            previous = self.load().get(render_key)
+            if previous:
+                # Files indexed earlier stay with the render, e.g. its video under a --marketing-only rewrite
+                for kind, path in previous['files'].items():
+                    path = os.path.join(self.output_dir, path)
+                    if kind not in files and os.path.exists(path):
+                        files[kind] = path
+            entry = {
+                'render_key': render_key,
+                'topic': topic,
+                'variation': variation,
+                'used': now,
+                'files': {kind: os.path.relpath(path, self.output_dir) for kind, path in files.items()},
+                'bytes': sum(os.path.getsize(path) for path in files.values()),
+                'created': previous['created'] if previous else now
+            }
+            self.entries[render_key] = entry
+            self.append(entry)
+        return entry
+
+    def lookup(self, render_key):
+        """Absolute paths of an indexed render's files by kind, or None"""
+        with self.lock:
+            entry = self.load().get(render_key)
+        if entry is None:
+            return None
+        return {kind: os.path.join(self.output_dir, path) for kind, path in entry['files'].items()}
+
+    def find(self, topic=None, variation=None):
+        """Indexed renders of a topic and/or variation, most recently used first"""
+        with self.lock:
+            entries = [entry for entry in self.load().values()
+                       if (topic is None or entry['topic'] == topic)
+                       and (variation is None or entry['variation'] == variation)]
+        return sorted(entries, key=lambda entry: entry['used'], reverse=True)
+
+    def stats(self):
+        """Indexed render count and size, and the current run log size"""
+        with self.lock:
+            entries = list(self.load().values())
+        return {
+            'renders': len(entries),
+            'size_mb': round(sum(entry['bytes'] for entry in entries) / (1024 * 1024), 1),
+            'run_log_mb': round(os.path.getsize(self.run_log_path) / (1024 * 1024), 2)
+            if os.path.exists(self.run_log_path) else 0.0
+        }
+
+    def prune(self, max_age_days, intermediate_dirs=(), intermediate_days=7, sweep_dirs=(), partial_hours=24):
+        """Delete renders unused for max_age_days or already evicted, stale intermediates and
+        crash leftovers, then compact the index"""
+        now = time.time()
+        removed = []
+        freed = 0
+
+        def remove(path):
+            nonlocal freed
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            freed += size
+            removed.append(path)
+
+        with self.lock:
+            entries = self.load()
+            pruned = []
+            for render_key, entry in list(entries.items()):
+                paths = {kind: os.path.join(self.output_dir, path) for kind, path in entry['files'].items()}
+                expired = max_age_days > 0 and now - entry['used'] > max_age_days * 86400
+                # A video evicted by the render cache takes its thumbnail and marketing package with it
+                evicted = 'video' in paths and not os.path.exists(paths['video'])
+                gone = not any(os.path.exists(path) for path in paths.values())
+                if expired or evicted or gone:
+                    for path in paths.values():
+                        remove(path)
+                    del entries[render_key]
+                    pruned.append(render_key)
+
+            # Rewrite the index without superseded lines and tombstones
+            partial_path = self.index_path + '.partial'
+            with open(partial_path, 'w') as f:
+                for entry in entries.values():
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(partial_path, self.index_path)
+
+        # Narration WAVs and segments are rebuilt on demand, so they age out sooner
+        for directory in list(intermediate_dirs) + list(sweep_dirs):
+            if not os.path.isdir(directory):
+                continue
+            intermediate = directory in intermediate_dirs
+            for entry in os.scandir(directory):
+                if not entry.is_file():
+                    continue
+                age = now - entry.stat().st_mtime
+                if ('.partial' in entry.name and age > partial_hours * 3600) or \
+                        (intermediate and intermediate_days > 0 and age > intermediate_days * 86400):
+                    remove(entry.path)
+
+        # cProfile dumps follow the render retention
+        if max_age_days > 0:
+            for entry in os.scandir(self.logs_dir):
+                if entry.name.startswith('profile_') and entry.name.endswith('.prof') \
+                        and now - entry.stat().st_mtime > max_age_days * 86400:
+                    remove(entry.path)
+
+        return {'renders': len(pruned), 'files': len(removed), 'freed_mb': round(freed / (1024 * 1024), 1)}
+
+    def compact_legacy_logs(self):
+        """Fold per-run logs and batch manifests of earlier versions into runs.jsonl, oldest first"""
+        legacy = []
+        for name in os.listdir(self.logs_dir):
+            for prefix, kind in self.LEGACY_LOGS:
+                if name.startswith(prefix) and name.endswith('.json'):
+                    legacy.append((name[len(prefix):], kind, os.path.join(self.logs_dir, name)))
+
+        folded = 0
+        for _, kind, path in sorted(legacy):
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except ValueError:
+                continue
+            self.log_run(kind, entry)
+            os.remove(path)
+            folded += 1
+        return folded
+
+class CaptionSprite:
+    """Pre-rendered caption placed on the frame for a time span"""
+
+    def __init__(self, rgba, x, y, start, duration):
+        self.rgba = rgba
+        self.x = x
+        self.y = y
+        self.start = start
+        self.duration = duration
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+class LayerCompositor:
+    """Blends the background and active caption sprites into a preallocated frame"""
+
+    def __init__(self, background, sprites, width, height):
+        self.background = background
+        self.sprites = sprites
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+
+        self.layers = [(sprite,) + prepare_blend(sprite.rgba) for sprite in sprites]
+
+        # Background frame and dirty rectangles last written into each buffer
+        self.buffer_state = {}
+        self.scratch = threading.local()
+        self.lock = threading.Lock()
+        self.timings = {'background': 0.0}
+        self.timings.update({f'caption_{i}': 0.0 for i in range(len(sprites))})
+        self.frame_count = 0
+
+    def make_frame(self, t, out=None):
+        """Composite the frame at time t into out (the shared buffer by default)"""
+        frame = self.buffer if out is None else out
+        timings = {}
+
+        start = time.perf_counter()
+        background = self.background(t, out=frame)
+        last_background, dirty = self.buffer_state.get(id(frame), (None, []))
+        if background is frame:
+            pass  # Rendered in place
+        elif background is last_background:
+            # Unchanged cached background, only undo the previous captions
+            for y0, y1, x0, x1 in dirty:
+                frame[y0:y1, x0:x1] = background[y0:y1, x0:x1]
+        else:
+            np.copyto(frame, background)
+        timings['background'] = time.perf_counter() - start
+
+        dirty = []
+        works = thread_scratch(self.scratch, 'works',
+                               lambda: [np.empty_like(premultiplied) for _, premultiplied, _ in self.layers])
+        for i, (sprite, premultiplied, inverse) in enumerate(self.layers):
+            if not sprite.start <= t < sprite.end:
+                continue
+
+            start = time.perf_counter()
+            height, width = premultiplied.shape[:2]
+            region = frame[sprite.y:sprite.y + height, sprite.x:sprite.x + width]
+            blend_into(region, premultiplied, inverse, works[i])
+            dirty.append((sprite.y, sprite.y + height, sprite.x, sprite.x + width))
+            timings[f'caption_{i}'] = time.perf_counter() - start
+
+        # Only cached backgrounds are stable objects worth diffing against
+        is_cached = not background.flags.writeable
+        self.buffer_state[id(frame)] = (background if is_cached else None, dirty)
+
+        with self.lock:
+            for name, seconds in timings.items():
+                self.timings[name] += seconds
+            self.frame_count += 1
+
+        return frame
+
+    @staticmethod
+    def merge_timing_reports(reports):
+        """Combine timing reports from several compositors, weighted by frames"""
+        frames = sum(report['frames'] for report in reports)
+        merged = {}
+        for report in reports:
+            for name, ms in report.items():
+                if name != 'frames':
+                    merged[name] = merged.get(name, 0.0) + ms * report['frames'] / max(frames, 1)
+        merged = {name: round(ms, 3) for name, ms in merged.items()}
+        merged['frames'] = frames
+        return merged
+
+    def timing_report(self):
+        """Mean milliseconds per frame spent in each layer"""
+        frames = max(self.frame_count, 1)
+        report = {name: round(seconds * 1000 / frames, 3) for name, seconds in self.timings.items()}
+        report['total'] = round(sum(self.timings.values()) * 1000 / frames, 3)
+        report['frames'] = self.frame_count
+        return report
+
+class RenderTimeline:
+    """Ordered frame sources that make up the full video"""
+
+    def __init__(self, fps):
+        self.fps = fps
+        self.segments = []  # (start frame, frame count, make_frame)
+
+    def add(self, duration, make_frame):
+        """Append a segment of the given duration"""
+        start = self.frame_count()
+        self.segments.append((start, int(round(duration * self.fps)), make_frame))
+
+    def frame_count(self):
+        if not self.segments:
+            return 0
+        start, count, _ = self.segments[-1]
+        return start + count
+
+    def frame(self, index, out=None):
+        """Frame at a global frame index, timed relative to its segment, rendered into out if given"""
+        for start, count, make_frame in self.segments:
+            if index < start + count:
+                break
+        if out is None:
+            return make_frame((index - start) / self.fps)
+        return make_frame((index - start) / self.fps, out=out)
+
+class FrameProducer:
+    """Renders timeline frames ahead of the encoder on a thread pool, into a fixed ring of buffers"""
+
+    def __init__(self, timeline, start, end, width, height, threads=1, buffers=None, profiles=None):
+        self.timeline = timeline
+        self.start = start
+        self.end = end
+        self.threads = max(1, threads)
+        # Enough slots for every producer plus one frame being encoded; never more,
+        # so memory stays flat however long the video is
+        size = max(2, buffers or self.threads + 2)
+        self.ring = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(size)]
+        self.ready = [-1] * size  # Frame index held by each slot
+        self.frames = [None] * size  # What make_frame returned for it (a cached frame or the slot buffer)
+        self.condition = threading.Condition()
+        self.next_index = start
+        self.released = start  # Frames below this have been handed to the encoder
+        self.error = None
+        self.stopped = False
+        self.stall_seconds = 0.0
+        self.profiles = profiles  # ProfileCollector when the run is profiled
+
+    def produce(self):
+        """Producer thread: claim the next frame index, wait for its slot, render into it"""
+        size = len(self.ring)
+        while True:
+            with self.condition:
+                if self.stopped or self.next_index >= self.end:
+                    return
+                index = self.next_index
+                self.next_index += 1
+                # Backpressure: the slot is free once the encoder has taken index - size
+                while index - self.released >= size and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+
+            slot = index % size
+            try:
+                frame = self.timeline.frame(index, out=self.ring[slot])
+            except BaseException as e:
+                with self.condition:
+                    self.error = e
+                    self.stopped = True
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.frames[slot] = frame
+                self.ready[slot] = index
+                self.condition.notify_all()
+
+    def __iter__(self):
+        """Yield frames in order; each is valid until the next one is requested"""
+        size = len(self.ring)
+        produce = self.profiles.wrap(self.produce) if self.profiles else self.produce
+        workers = [threading.Thread(target=produce, daemon=True) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        try:
+            for index in range(self.start, self.end):
+                slot = index % size
+                with self.condition:
+                    if self.ready[slot] != index:
+                        waited = time.perf_counter()
+                        while self.ready[slot] != index and self.error is None:
+                            self.condition.wait()
+                        self.stall_seconds += time.perf_counter() - waited
+                    if self.ready[slot] != index:
+                        raise self.error
+                    frame = self.frames[slot]
+                yield frame
+                with self.condition:
+                    self.released = index + 1
+                    self.condition.notify_all()
+        finally:
+            with self.condition:
+                self.stopped = True
+                self.condition.notify_all()
+            for worker in workers:
+                worker.join()
+
+def start_ffmpeg(input_args, output_args, output_path, pcm=None, sample_rate=44100, stdin=None):
+    """Spawn ffmpeg on a video input, feeding mono int16 PCM (if any) through a second pipe"""
+    ffmpeg = os.environ.get('IMAGEIO_FFMPEG_EXE', 'ffmpeg')
+    command = [ffmpeg, '-y', '-loglevel', 'error'] + input_args
+
+    audio_read = audio_write = None
+    if pcm is not None:
+        audio_read, audio_write = os.pipe()
+        command += ['-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', f'pipe:{audio_read}']
+
+    command += ['-map', '0:v'] + output_args
+    if pcm is not None:
+        command += ['-map', '1:a', '-c:a', 'aac']
+    command += ['-movflags', '+faststart', output_path]
+
+    process = subprocess.Popen(
+        command,
+        stdin=stdin if stdin is not None else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        pass_fds=(audio_read,) if audio_read is not None else ()
+    )
+
+    audio_thread = None
+    if pcm is not None:
+        os.close(audio_read)
+        audio_thread = threading.Thread(target=_write_pcm, args=(audio_write, pcm), daemon=True)
+        audio_thread.start()
+
+    return process, audio_thread
+
+def _write_pcm(fd, pcm):
+    try:
+        with os.fdopen(fd, 'wb') as audio_pipe:
+            audio_pipe.write(np.ascontiguousarray(pcm, dtype='<i2').tobytes())
+    except (BrokenPipeError, OSError):
+        pass  # ffmpeg exited early, the error surfaces in finish_ffmpeg()
+
+def finish_ffmpeg(process, audio_thread=None):
+    """Wait for ffmpeg to exit, raising with its error output on failure"""
+    if process.stdin:
+        process.stdin.close()
+    if audio_thread:
+        audio_thread.join()
+    stderr = process.stderr.read().decode(errors='replace')
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.strip()}")
+
+def concat_segments(segment_paths, output_path, pcm=None, sample_rate=44100):
+    """Join encoded segments with the concat demuxer, muxing in the narration"""
+    list_path = output_path + '.segments.txt'
+    with open(list_path, 'w') as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    try:
+        process, audio_thread = start_ffmpeg(
+            ['-f', 'concat', '-safe', '0', '-i', list_path],
+            ['-c:v', 'copy'],
+            output_path, pcm, sample_rate
+        )
+        finish_ffmpeg(process, audio_thread)
+    finally:
+        os.remove(list_path)
+
+def segment_pool_context():
+    """Start method for segment pools: forking a process with render or upload threads can deadlock the child"""
+    import multiprocessing
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+def render_segment(job, system=None):
+    """Render and encode one frame range of a video, on system's caches when run in-process"""
+    if system is None:
+        # Process pool workers start with cold caches that die with the worker
+        system = ViralLegalShortsSystem()
+        system.video_config.update(job['video_config'])
+        if job.get('profile_path'):
+            # Under --profile each worker dumps its own cProfile for the parent to merge
+            import cProfile
+            system.cprofile = ProfileCollector()
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(render_segment, job, system)
+            finally:
+                system.cprofile.merged(profile).dump_stats(job['profile_path'])
+    profiler = StageProfiler()
+    timeline, compositor = system.build_timeline(job['content_data'], job['theme'], profiler)
+
+    # Encode to a name of this writer's own next to the final path and rename,
+    # so a cached segment is never partial and concurrent writers never collide
+    fd, partial_path = tempfile.mkstemp(suffix='.partial.mp4', dir=os.path.dirname(job['path']))
+    os.close(fd)
+    try:
+        stats = system.export_with_ffmpeg_pipe(timeline, partial_path, start=job['start'], end=job['end'],
+                                               profiler=profiler)
+        os.replace(partial_path, job['path'])
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    stats['layer_timings_ms'] = compositor.timing_report()
+    stats['profile'] = profiler.report()
+    return stats
+
+class FFmpegPipeWriter:
+    """Streams raw RGB frames and PCM narration into one long-lived ffmpeg process"""
+
+    def __init__(self, output_path, width, height, fps, preset='medium', crf=23, threads=0):
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.process = None
+        self.audio_thread = None
+        self.frames = 0
+        self.started = None
+
+    def open(self, pcm=None, sample_rate=44100):
+        """Start ffmpeg reading raw frames from stdin"""
+        self.process, self.audio_thread = start_ffmpeg(
+            ['-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{self.width}x{self.height}', '-r', str(self.fps), '-i', '-'],
+            ['-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+             '-threads', str(self.threads), '-pix_fmt', 'yuv420p'],
+            self.output_path, pcm, sample_rate, stdin=subprocess.PIPE
+        )
+        self.started = time.perf_counter()
+
+    def write(self, frame):
+        """Write one height x width x 3 uint8 RGB frame"""
+        self.process.stdin.write(np.ascontiguousarray(frame).data)
+        self.frames += 1
+
+    def close(self):
+        """Finish encoding and return throughput stats"""
+        finish_ffmpeg(self.process, self.audio_thread)
+
+        elapsed = time.perf_counter() - self.started
+        return {
+            'frames': self.frames,
+            'seconds': round(elapsed, 3),
+            'fps': round(self.frames / elapsed, 1) if elapsed else 0.0,
+            'preset': self.preset,
+            'crf': self.crf,
+            'threads': self.threads
+        }
+
+    def abort(self):
+        """Kill ffmpeg after a rendering error"""
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+class TitleCardRenderer:
+    """Title card from a vectorized stripe table and a pre-rendered glow sprite"""
+
+    def __init__(self, title, width, height, sprite_cache=None):
+        self.width = width
+        self.height = height
+        self.scale = layout_scale(width)
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+
+        # Each stripe is a filled 11-row band starting every 20 rows (at reference scale)
+        self.stripe_pitch = scaled_px(20, self.scale, 2)
+        self.stripe_height = min(scaled_px(11, self.scale), self.stripe_pitch - 1)
+        self.stripe_phase = 0.1 * np.arange(0, height, self.stripe_pitch) / self.scale
+        self.scratch = threading.local()
+
+        # The glow sprite costs two full-frame blurs; reuse it across segments and the thumbnail
+        cache_key = (title, width, height)
+        if sprite_cache is not None and cache_key in sprite_cache:
+            self.sprite, self.blend = sprite_cache[cache_key]
+        else:
+            self.sprite = self.render_title_sprite(title)
+            self.blend = prepare_blend(self.sprite[0]) if self.sprite else None
+            if sprite_cache is not None:
+                sprite_cache[cache_key] = (self.sprite, self.blend)
+
+    def render_title_sprite(self, title):
+        """Draw the glowing title once as a straight-alpha RGBA sprite"""
+        canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        alpha = np.zeros((self.height, self.width), dtype=np.uint8)
+
+        # Title text
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        title_text = title.upper()
+        
+        # Handle long titles
+        if len(title_text) > 30:
+            words = title_text.split()
+            mid = len(words) // 2
+            line1 = " ".join(words[:mid])
+            line2 = " ".join(words[mid:])
+            lines = [line1, line2]
+        else:
+            lines = [title_text]
+        
+        # Draw title
+        font_scale = 2.0 * self.scale
+        thickness = scaled_px(5, self.scale)
+        line_height = scaled_px(120, self.scale)
+        start_y = self.height // 2 - (len(lines) * line_height // 2)
+        positions = []
+        
+        for i, line in enumerate(lines):
+            text_size = cv2.getTextSize(line, font, font_scale, thickness)[0]
+            x = (self.width - text_size[0]) // 2
+            y = start_y + i * line_height
+            positions.append((line, x, y))
+            
+            # Glowing effect
+            for offset in range(8, 0, -1):
+                glow = 1.0 - (offset / 10.0)
+                glow_color = (int(255 * glow), int(255 * glow), 0)
+                glow_thickness = scaled_px(5 + offset, self.scale)
+                cv2.putText(canvas, line, (x, y), font, font_scale, glow_color, glow_thickness, cv2.LINE_AA)
+                cv2.putText(alpha, line, (x, y), font, font_scale, 255, glow_thickness, cv2.LINE_AA)
+
+        # Soften the glow once; canvas and alpha are premultiplied, so blur both
+        canvas = cv2.GaussianBlur(canvas, (0, 0), 3 * self.scale)
+        alpha = cv2.GaussianBlur(alpha, (0, 0), 3 * self.scale)
+
+        # Main text stays sharp on top of the glow
+        for line, x, y in positions:
+            cv2.putText(canvas, line, (x, y), font, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
+            cv2.putText(alpha, line, (x, y), font, font_scale, 255, thickness, cv2.LINE_AA)
+
+        return crop_sprite(canvas, alpha)
+
+    def render(self, t, out=None):
+        """Render the frame at time t into out (the shared buffer by default)"""
+        frame = self.buffer if out is None else out
+
+        # Animated background: one row per stripe, then whole-row copies into each band
+        intensity = (30 + 20 * np.sin(self.stripe_phase + t * 3)).astype(np.int64)
+        stripe_colors = np.stack([intensity, intensity // 2, intensity * 2], axis=1).astype(np.uint8)
+        stripe_rows = thread_scratch(self.scratch, 'stripe_rows',
+                                     lambda: np.empty((len(self.stripe_phase), self.width, 3), dtype=np.uint8))
+        fill_row_colors(stripe_rows, stripe_colors)
+
+        pitch, stripe = self.stripe_pitch, self.stripe_height
+        bands = self.height // pitch
+        blocks = frame[:bands * pitch].reshape(bands, pitch, -1)
+        blocks[:, :stripe] = stripe_rows[:bands].reshape(bands, 1, -1)
+        blocks[:, stripe:] = 0
+        if self.height > bands * pitch:
+            tail = frame[bands * pitch:]
+            tail[:stripe] = stripe_rows[bands]
+            tail[stripe:] = 0
+
+        if self.sprite:
+            rgba, x, y = self.sprite
+            region = frame[y:y + rgba.shape[0], x:x + rgba.shape[1]]
+            work = thread_scratch(self.scratch, 'work', lambda: np.empty_like(self.blend[0]))
+            blend_into(region, *self.blend, work)
+
+        return frame
+
+class AnimatedBackgroundRenderer:
+    """Background engine with per-theme precomputed gradient tables"""
+
+    # Gradient themes: (row phase step, time speed, base intensity, amplitude)
+    GRADIENTS = {
+        'corporate': (0.01, 0.5, 50, 30),
+        'legal': (0.01, 0.5, 50, 30),
+        'justice': (0.005, 0.3, 60, 20),
+    }
+
+    def __init__(self, theme, width, height):
+        self.theme = theme
+        self.width = width
+        self.height = height
+        self.scale = layout_scale(width)
+        self.buffer = np.zeros((height, width, 3), dtype=np.uint8)
+        self.base_frame = None
+
+        # Row coordinates in reference-layout pixels
+        rows = np.arange(height) / self.scale
+        if theme in self.GRADIENTS:
+            step, self.speed, self.base, self.amplitude = self.GRADIENTS[theme]
+            # Per-row phase is fixed for the theme, only the time offset moves
+            self.row_phase = step * rows
+        else:
+            # Flat and static themes share one precomputed base frame
+            if theme == "cyber":
+                colors = np.tile(np.array([0, 20, 0], dtype=np.uint8), (height, 1))  # Dark green base
+            elif theme == "tech":
+                colors = np.tile(np.array([20, 20, 50], dtype=np.uint8), (height, 1))  # Dark blue
+            else:
+                # Default theme does not depend on t
+                intensity = (40 + 20 * np.sin(0.002 * rows)).astype(np.int64)
+                colors = np.stack([intensity, intensity, intensity + 30], axis=1).astype(np.uint8)
+            self.base_frame = fill_row_colors(np.empty_like(self.buffer), colors)
+
+    def period(self):
+        """Loop period of the theme in seconds (0 for static themes, None if unknown)"""
+        if self.theme in ["corporate", "legal", "justice"]:
+            # LCM of the gradient, element and sway periods
+            return 20 * math.pi
+        if self.theme == "cyber":
+            # Rain drops wrap around height + 200 pixels at 200 px/s
+            return (self.height / self.scale + 200) / 200
+        if self.theme == "tech":
+            return math.pi
+        return 0
+
+    def frame_source(self, fps, duration, cache=None):
+        """Return make_frame(t, out=None) replaying one rendered cycle of the theme from cache"""
+        period = self.period()
+        if cache is None or period is None:
+            return self.render
+
+        # Loops are quantised to whole frames, so each cycle repeats exactly
+        period_frames = int(round(period * fps))
+        if period_frames >= int(round(duration * fps)):
+            return self.render  # Clip ends before the loop, nothing to replay
+
+        clip_key = (self.theme, self.width, self.height, fps)
+
+        def make_frame(t, out=None):
+            index = int(round(t * fps)) % period_frames if period_frames else 0
+            frame = cache.get(clip_key + (index,))
+            if frame is None:
+                frame = self.render(index / fps, out)
+                cache.put(clip_key + (index,), frame)
+            return frame
+
+        return make_frame
+
+    def gradient_colors(self, t):
+        """Per-row colors of the theme gradient at time t"""
+        intensity = (self.base + self.amplitude * np.sin(self.row_phase + t * self.speed)).astype(np.int64)
+        return np.stack([intensity // 3, intensity // 2, intensity], axis=1).astype(np.uint8)
+
+    def render(self, t, out=None):
+        """Render the frame at time t into out (the shared buffer by default)"""
+        frame = self.buffer if out is None else out
+
+        if self.theme in ["corporate", "legal"]:
+            # Professional blue gradient with moving elements
+            fill_row_colors(frame, self.gradient_colors(t))
+
+            # Add moving elements
+            for i in range(3):
+                x = int(self.scale * (200 + 600 * (i/2) + 100 * math.sin(t + i)))
+                y = int(self.scale * (400 + 400 * math.sin(t * 0.3 + i)))
+                if 0 <= x < self.width and 0 <= y < self.height:
+                    cv2.circle(frame, (x, y), scaled_px(50, self.scale), (100, 150, 255), -1)
+                    cv2.circle(frame, (x, y), scaled_px(30, self.scale), (150, 200, 255), -1)
+
+        elif self.theme == "justice":
+            # Golden justice theme
+            fill_row_colors(frame, self.gradient_colors(t))
+
+            # Scales of justice animation
+            px = lambda value: scaled_px(value, self.scale)
+            center_x = self.width // 2
+            scale_y = int(self.scale * (500 + 50 * math.sin(t)))
+            cv2.rectangle(frame, (center_x-px(100), scale_y), (center_x+px(100), scale_y+px(20)), (200, 180, 100), -1)
+            cv2.circle(frame, (center_x-px(60), scale_y), px(40), (255, 215, 0), px(3))
+            cv2.circle(frame, (center_x+px(60), scale_y), px(40), (255, 215, 0), px(3))
+
+        elif self.theme == "cyber":
+            # Matrix-style background
+            np.copyto(frame, self.base_frame)
+
+            # Digital rain effect, one drop per 30 reference pixels
+            px = lambda value: scaled_px(value, self.scale)
+            for column in range(0, int(round(self.width / self.scale)), 30):
+                x = int(column * self.scale)
+                drop_pos = int(self.scale * ((t * 200 + column * 5) % (self.height / self.scale + 200)))
+                if 0 <= drop_pos < self.height:
+                    intensity = max(50, int(255 - abs(drop_pos - self.height//2) * 2 / self.scale))
+                    cv2.rectangle(frame, (x, drop_pos-px(20)), (x+px(10), drop_pos+px(20)), (0, intensity, 0), -1)
+
+        elif self.theme == "tech":
+            # Tech/AI theme with neural network
+            np.copyto(frame, self.base_frame)
+
+            # Animated connections
+            px = lambda value: scaled_px(value, self.scale)
+            nodes = [(px(300), px(400)), (px(600), px(300)), (px(900), px(500)), (px(500), px(800)), (px(700), px(1200))]
+            for i, (x1, y1) in enumerate(nodes[:4]):  # Limit to screen
+                if y1 < self.height:
+                    pulse_size = int(self.scale * (30 + 20 * math.sin(t * 2 + i)))
+                    cv2.circle(frame, (x1, y1), pulse_size, (0, 200, 255), -1)
+                    cv2.circle(frame, (x1, y1), pulse_size//2, (100, 255, 255), -1)
+
+                    # Connections
+                    for j, (x2, y2) in enumerate(nodes[i+1:i+3], i+1):
+                        if j < len(nodes) and y2 < self.height:
+                            cv2.line(frame, (x1, y1), (x2, y2), (0, 100, 200), px(2))
+
+        else:  # Default professional theme
+            np.copyto(frame, self.base_frame)
+
+        return frame
+
+class ContentStore:
+    """Scripts indexed by (topic, variation) and by scheduled date, from JSON, JSON Lines or SQLite"""
+
+    # Record layout of each backend:
+    #   topics.json  {"scripts": [{topic, variation, title, script, key_facts, date?}, ...]}
+    #   .jsonl       one such object per line
+    #   SQLite       CREATE TABLE scripts (topic TEXT, variation INTEGER, title TEXT, script TEXT,
+    #                                      key_facts TEXT, date TEXT)
+    #                key_facts holds a JSON list; date (YYYY-MM-DD) is optional, as is its column
+
+    # Fields every record needs, and the ones handed to the renderer
+    REQUIRED_FIELDS = {'topic': str, 'variation': int, 'title': str, 'script': str, 'key_facts': list}
+    CONTENT_FIELDS = ('title', 'script', 'key_facts')
+
+    def __init__(self, path, lazy=False):
+        self.path = path
+        self.lazy = lazy
+        self.records = {}  # (topic, variation) -> content
+        self.offsets = {}  # (topic, variation) -> JSONL byte offset, for lazy loads
+        self.by_date = {}  # 'YYYY-MM-DD' -> (topic, variation)
+        self.variations = OrderedDict()  # topic -> sorted variation numbers
+        self.lock = threading.Lock()
+        self.db = None
+
+        if path.endswith(('.db', '.sqlite', '.sqlite3')):
+            self.backend = 'sqlite'
+            self.open_sqlite()
+        elif path.endswith('.jsonl'):
+            self.backend = 'jsonl'
+            self.open_jsonl()
+        else:
+            self.backend = 'json'
+            with open(path, encoding='utf-8') as f:
+                scripts = json.load(f).get('scripts', [])
+            for i, record in enumerate(scripts):
+                self.add(record, f"{path}: scripts[{i}]")
+
+        for topic in self.variations:
+            self.variations[topic].sort()
+
+    def validate(self, record, where):
+        """Raise ValueError naming the record if a field is missing, mistyped or empty"""
+        if not isinstance(record, dict):
+            raise ValueError(f"{where}: record is not an object")
+        for field, kind in self.REQUIRED_FIELDS.items():
+            value = record.get(field)
+            if not isinstance(value, kind) or isinstance(value, bool) or (kind is not int and not value):
+                raise ValueError(f"{where}: '{field}' must be a non-empty {kind.__name__}")
+        if not record['script'].split():
+            raise ValueError(f"{where}: 'script' has no words")
+        date = record.get('date')
+        if date is not None:
+            try:
+                datetime.strptime(date, "%Y-%m-%d")
+            except (TypeError, ValueError):
+                raise ValueError(f"{where}: 'date' must be YYYY-MM-DD") from None
+
+    def add(self, record, where, offset=None):
+        """Validate and index one record, keeping its content unless loading lazily"""
+        self.validate(record, where)
+        key = (record['topic'], record['variation'])
+        if key[1] in self.variations.get(key[0], ()):
+            raise ValueError(f"{where}: duplicate topic/variation {key}")
+        self.variations.setdefault(key[0], []).append(key[1])
+
+        date = record.get('date')
+        if date:
+            if date in self.by_date:
+                raise ValueError(f"{where}: {date} is already scheduled for {self.by_date[date]}")
+            self.by_date[date] = key
+
+        if offset is not None and self.lazy:
+            self.offsets[key] = offset
+        else:
+            self.records[key] = {field: record[field] for field in self.CONTENT_FIELDS}
+
+    def open_jsonl(self):
+        """Validate and index every line; lazy stores keep only byte offsets"""
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"{self.path}:{number}: {e}") from None
+                    self.add(record, f"{self.path}:{number}", offset)
+                offset += len(line)
+
+    def open_sqlite(self):
+        """Index the scripts table; lazy stores fetch full rows on first use"""
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        if self.lazy:
+            columns = {row['name'] for row in self.db.execute("PRAGMA table_info(scripts)")}
+            date = "date" if 'date' in columns else "NULL AS date"
+            for row in self.db.execute(f"SELECT rowid, topic, variation, {date} FROM scripts"):
+                # Index columns are validated now, the rest when the row is loaded
+                record = dict(row, title='-', script='-', key_facts=['-'])
+                self.add(record, f"{self.path}: row {row['rowid']}", offset=row['rowid'])
+        else:
+            for row in self.db.execute("SELECT rowid, * FROM scripts"):
+                self.add(self.sqlite_record(row), f"{self.path}: row {row['rowid']}")
+
+    def sqlite_record(self, row):
+        """A scripts row as a record, with key_facts decoded from JSON"""
+        record = dict(row)
+        try:
+            record['key_facts'] = json.loads(record['key_facts'])
+        except (TypeError, ValueError):
+            pass  # Left as is, validation reports it
+        return record
+
+    def load(self, key):
+        """Read one lazily indexed record"""
+        if self.backend == 'sqlite':
+            row = self.db.execute("SELECT rowid, * FROM scripts WHERE rowid = ?", (self.offsets[key],)).fetchone()
+            record, where = self.sqlite_record(row), f"{self.path}: row {row['rowid']}"
+        else:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offsets[key])
+                record, where = json.loads(f.readline()), f"{self.path}: offset {self.offsets[key]}"
+        self.validate(record, where)
+        return {field: record[field] for field in self.CONTENT_FIELDS}
+
+    def get(self, topic, variation):
+        """Content of a topic variation, or None if it does not exist"""
+        key = (topic, variation)
+        content = self.records.get(key)
+        if content is None and key in self.offsets:
+            with self.lock:
+                content = self.records.get(key)
+                if content is None:
+                    content = self.records[key] = self.load(key)
+        return content
+
+    def preload(self, keys):
+        """Load the given (topic, variation) records ahead of a batch run"""
+        for topic, variation in keys:
+            self.get(topic, variation)
+
+    def scheduled(self, date):
+        """(topic, variation) pinned to a date, if any"""
+        return self.by_date.get(date.strftime("%Y-%m-%d"))
+
+    def variation_count(self, topic):
+        return len(self.variations.get(topic, ()))
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'records': sum(len(v) for v in self.variations.values()),
+            'loaded': len(self.records),
+            'topics': len(self.variations),
+            'dated': len(self.by_date)
+        }
+
+class DeliveryClient:
+    """Chunked, resumable uploads with retry and backoff over one pooled HTTP session"""
+
+    # Upload protocol of the delivery endpoint (a Telegram/Drive relay):
+    #   POST /uploads {name, size, sha256, content_type} -> {id, offset}, resuming a known sha256
+    #   PUT  /uploads/<id> + Content-Range: bytes a-b/size   -> {offset}, 409 if a is not the offset
+    #   GET  /uploads/<id>                                   -> {offset}
+    RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+    def __init__(self, url, token=None, chunk_mb=8, retries=5, backoff=0.5, max_backoff=30, pool_size=8, timeout=60):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.requests = requests
+        self.url = url.rstrip('/')
+        self.chunk_size = max(1, int(chunk_mb * 1024 * 1024))
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        # One keep-alive pool shared by every upload thread
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+
+    def request(self, method, path, **kwargs):
+        """Send a request, retrying dropped connections and retryable statuses with jittered backoff"""
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                response = self.session.request(method, self.url + path, timeout=self.timeout, **kwargs)
+            except (self.requests.ConnectionError, self.requests.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                error = self.requests.HTTPError(f"{response.status_code} from {method} {path}", response=response)
+                retry_after = response.headers.get('Retry-After')
+
+            if attempt == self.retries:
+                raise error
+            if retry_after and retry_after.isdigit():
+                delay = int(retry_after)
+            else:
+                delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+            # A relay asking for an hour must not stall the daily run for an hour per retry
+            time.sleep(min(delay, self.max_backoff))
+
+    def upload(self, path, content_type='application/octet-stream'):
+        """Upload a file in chunks, resuming from whatever the server already has"""
+        started = time.perf_counter()
+        size = os.path.getsize(path)
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+
+        upload = self.request('POST', '/uploads', json={
+            'name': os.path.basename(path), 'size': size, 'sha256': sha256.hexdigest(), 'content_type': content_type
+        }).json()
+        upload_id, offset = upload['id'], upload['offset']
+        resumed_from = offset
+
+        with open(path, 'rb') as f:
+            while offset < size:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                headers = {
+                    'Content-Range': f"bytes {offset}-{offset + len(chunk) - 1}/{size}",
+                    'Content-Type': 'application/octet-stream'
+                }
+                try:
+                    offset = self.request('PUT', f"/uploads/{upload_id}", data=chunk, headers=headers).json()['offset']
+                except self.requests.HTTPError as e:
+                    if e.response is None or e.response.status_code != 409:
+                        raise
+                    # A retried chunk may have landed already, continue from the server's offset
+                    offset = self.request('GET', f"/uploads/{upload_id}").json()['offset']
+
+        return {
+            'path': path,
+            'id': upload_id,
+            'bytes': size,
+            'resumed_from': resumed_from,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+class DeliveryQueue:
+    """Uploads finished videos in the background so rendering never waits on the network"""
+
+    CONTENT_TYPES = {'.mp4': 'video/mp4', '.jpg': 'image/jpeg', '.json': 'application/json'}
+
+    def __init__(self, client, workers=4):
+        self.client = client
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='delivery')
+        self.pending = []  # (label, [(path, future)])
+        self.lock = threading.Lock()
+
+    def submit(self, label, paths):
+        """Queue every file of one video for concurrent upload and return at once"""
+        futures = []
+        for path in paths:
+            if path and os.path.exists(path):
+                content_type = self.CONTENT_TYPES.get(os.path.splitext(path)[1], 'application/octet-stream')
+                futures.append((path, self.pool.submit(self.client.upload, path, content_type)))
+        with self.lock:
+            self.pending.append((label, futures))
+
+    def wait(self):
+        """Block until queued uploads finish and return their results per video"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        results = []
+        for label, futures in pending:
+            files = []
+            for path, future in futures:
+                try:
+                    files.append(dict(future.result(), success=True))
+                except Exception as e:
+                    files.append({'path': path, 'success': False, 'error': str(e)})
+            results.append({'label': label, 'success': all(f['success'] for f in files), 'files': files})
+        return results
+
+class ViralLegalShortsSystem:
+    def __init__(self, content_path=None, lazy_content=False):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.output_dir = os.path.join(self.base_dir, "output")
         self.video_dir = os.path.join(self.output_dir, "videos")
         self.audio_dir = os.path.join(self.output_dir, "audio")
         self.thumbnail_dir = os.path.join(self.output_dir, "thumbnails")
+        self.preview_dir = os.path.join(self.output_dir, "previews")  # Drafts, with their thumbnails and packages
         self.logs_dir = os.path.join(self.base_dir, "logs")
+        self.preview = False
+        self.content_path = content_path or os.environ.get('CONTENT_STORE') or os.path.join(self.base_dir, "topics.json")
+        self.lazy_content = lazy_content
+        self._content_store = None
         
         # Create directories
         for directory in [self.output_dir, self.video_dir, self.audio_dir, self.thumbnail_dir, self.logs_dir]:
@@ -43,330 +1711,562 @@ class ViralLegalShortsSystem:
             'height': 1920,
             'fps': 30,
             'duration': 15,  # Shorter for testing
-            'font_scale': 1.5
+            'font_scale': 1.5,
+            'frame_cache_mb': 512,  # Memory cap for replayed background loops
+            'export_mode': 'segmented',  # 'segmented' (cached, parallel chunks), 'pipe' or 'moviepy'
+            'workers': 1,  # Process pool size for segmented renders
+            'render_segments': 4,  # Main-section slices, independent of workers
+            'render_cache_mb': 4096,  # Size cap for cached renders in output/, 0 disables
+            'audio_cache_mb': 256,  # Size cap for cached narration WAVs in output/audio, 0 disables
+            'encoder_preset': 'medium',
+            'crf': 23,
+            'encoder_threads': 0,  # 0 lets ffmpeg pick
+            'render_threads': 0,  # Frame producer threads per encode, 0 splits the cores between workers
+            'ring_buffers': 0,  # Preallocated frames in flight, 0 means render_threads + 2
+            'preview_scale': 0.25,  # Draft renders, see apply_preview
+            'preview_fps': 15,
+            'retention_days': 30,  # Renders unused this long are pruned, 0 keeps them
+            'intermediate_retention_days': 7,  # Same for narration WAVs and segments
+            'run_log_mb': 10,  # logs/runs.jsonl rotates past this size
+            'run_log_backups': 5
         }
 
+        # Rendered background cycles, shared by every video this system renders
+        self.frame_cache = FrameCache(self.video_config['frame_cache_mb'])
+        self.caption_cache = {}
+        self.title_cache = {}
+        self.audio_cache = AudioCache(self.audio_dir, self.video_config['audio_cache_mb'])
+        self.render_cache = RenderCache(
+            self.output_dir,
+            [self.video_dir, self.preview_dir],
+            self.video_config['render_cache_mb']
+        )
+        self.retention = RetentionManager(
+            self.output_dir,
+            self.logs_dir,
+            self.video_config['run_log_mb'],
+            self.video_config['run_log_backups']
+        )
+        self.delivery = None  # DeliveryQueue once enable_delivery() succeeds
+        self.cprofile = None  # ProfileCollector of worker threads under --profile
+        self.segment_pool = None  # ProcessPoolExecutor shared by the jobs of a batch
+        self.concurrent_jobs = 1  # Videos rendering at once, they split the cores
+
+    def apply_preview(self, scale=None, fps=None):
+        """Switch to a proportionally scaled, fast-encoding draft of the same timeline"""
+        scale = scale or self.video_config['preview_scale']
+        # libx264 with yuv420p needs even dimensions
+        even = lambda size: max(2, int(round(size * scale / 2)) * 2)
+        self.video_config.update(
+            width=even(self.video_config['width']),
+            height=even(self.video_config['height']),
+            fps=fps or self.video_config['preview_fps'],
+            export_mode='pipe',  # No pool start-up or segment bookkeeping for a short draft
+            encoder_preset='ultrafast'
+        )
+        # Drafts stay out of videos/, the artifact index and delivery
+        self.preview = True
+        os.makedirs(self.preview_dir, exist_ok=True)
+
     def get_current_topic(self):
         """Get current topic based on 8-day rotation"""
+        return self.get_topic_for_date(datetime.now())
+
+    @property
+    def content_store(self):
+        """Scripts loaded once, on first use (segment workers never need them)"""
+        if self._content_store is None:
+            self._content_store = ContentStore(self.content_path, self.lazy_content)
+        return self._content_store
+
+    def get_topic_for_date(self, date):
+        """Get the topic and variation scheduled for a date, pinned or by rotation"""
+        scheduled = self.content_store.scheduled(date)
+        if scheduled:
+            return scheduled
+
         start_date = datetime(2024, 1, 1)
-        days_passed = (datetime.now() - start_date).days
+        days_passed = (date - start_date).days
         topic_index = days_passed % 8
-        variation = (days_passed // 8) % 3
+        topic = self.topics[topic_index]
         
-        return self.topics[topic_index], variation
+        # Each full rotation moves on to the topic's next variation
+        variation = (days_passed // 8) % max(1, self.content_store.variation_count(topic))
+        return topic, variation
 
     def get_content_data(self, topic, variation):
         """Get content data for specific topic and variation"""
-        content_database = {
-            "consumer_rights": {
-                0: {
-                    "title": "Amazon Paid $100 MILLION - Here's Why",
-                    "script": "Amazon just paid one hundred MILLION dollars in fines! They charged Prime members without consent. The FTC fined them one hundred MILLION dollars. Customers got automatic refunds. This violates consumer protection laws. Check your subscriptions NOW for unauthorized charges!",
-                    "key_facts": ["$100M fine", "Prime members", "FTC action", "Consumer protection"]
-                }
-            },
-            "labor_employment": {
-                0: {
-                    "title": "Tesla Paid $137 MILLION - Workplace Discrimination", 
-                    "script": "Tesla just paid one hundred thirty seven MILLION dollars for discrimination! Employee faced racial harassment at Tesla. Company failed to address complaints. Jury awarded one hundred thirty seven MILLION in damages. Document all discrimination incidents. Know your workplace rights!",
-                    "key_facts": ["$137M settlement", "Racial harassment", "Tesla lawsuit", "Workplace rights"]
-                }
-            },
-            "data_privacy": {
-                0: {
-                    "title": "Meta Paid $5.1 BILLION GDPR Fine",
-                    "script": "Facebook parent company paid five point one BILLION dollars! Meta violated GDPR privacy regulations. Largest privacy fine in history. Your data is worth more than you think. EU gives you right to delete data. Review your privacy settings NOW!",
-                    "key_facts": ["$5.1B fine", "GDPR violation", "Privacy rights", "Data deletion"]
-                }
-            },
-            "corporate_law": {
-                0: {
-                    "title": "This CEO Got 30 YEARS in Prison",
-                    "script": "CEO sentenced to thirty YEARS for corporate fraud! Theranos CEO Elizabeth Holmes convicted. Defrauded investors of nine hundred MILLION dollars. Fake blood testing technology. Put patients lives at risk. Corporate executives aren't above the law!",
-                    "key_facts": ["30 years prison", "Elizabeth Holmes", "$900M fraud", "Theranos scandal"]
-                }
-            },
-            "family_law": {
-                0: {
-                    "title": "Hidden Assets in Divorce - $1M Found",
-                    "script": "Spouse hid one MILLION dollars in divorce! Cryptocurrency wallets are often hidden. Offshore accounts require investigation. Forensic accountants find hidden money. Hiding assets is contempt of court. Protect yourself - hire a forensic accountant!",
-                    "key_facts": ["$1M hidden", "Crypto wallets", "Forensic accounting", "Asset protection"]
-                }
-            },
-            "criminal_law": {
-                0: {
-                    "title": "Know Your Rights - Police Can't Do This", 
-                    "script": "Police violated rights - two point three MILLION settlement! You have the right to remain silent. Cannot search without warrant or consent. Must read Miranda rights during arrest. ILLEGAL evidence gets thrown out. Know your rights!",
-                    "key_facts": ["$2.3M settlement", "Miranda rights", "Search warrants", "Police misconduct"]
-                }
-            },
-            "intellectual_property": {
-                0: {
-                    "title": "This Patent Made $1 BILLION - Here's How",
-                    "script": "One patent generated one BILLION dollars in royalties! Pharmaceutical patents are extremely valuable. Patent trolls make MILLIONS licensing. Twenty year protection from filing date. Have an invention? File a patent application NOW!",
-                    "key_facts": ["$1B royalties", "Patent protection", "20-year term", "Patent filing"]
-                }
-            },
-            "ai_legal_tools": {
-                0: {
-                    "title": "AI Lawyer Won $50,000 Case",
-                    "script": "AI lawyer just won a fifty thousand dollar case! DoNotPay AI fights parking tickets. ChatGPT helps draft legal documents. AI analyzes contracts in minutes. Legal research became ten times faster. Try AI legal tools but verify with lawyers!",
-                    "key_facts": ["$50K case won", "DoNotPay AI", "Contract analysis", "Legal research"]
-                }
-            }
-        }
+        store = self.content_store
         
         # Default to first variation if not found
-        topic_data = content_database.get(topic, content_database["consumer_rights"])
-        return topic_data.get(variation, topic_data[0])
+        content = store.get(topic, variation) or store.get(topic, 0) or store.get("consumer_rights", 0)
+        if content is None:
+            raise ValueError(f"No script for {topic} in {self.content_path}")
+        return content
+
+    def resolve_variation(self, topic, variation):
+        """Variation whose content a topic variation renders, missing ones fall back to 0"""
+        return variation if self.content_store.get(topic, variation) is not None else 0
+
+    def background_frame_source(self, theme, duration):
+        """Return make_frame(t) for the animated background of a theme"""
+        renderer = AnimatedBackgroundRenderer(theme, self.video_config['width'], self.video_config['height'])
+        return renderer.frame_source(self.video_config['fps'], duration, self.frame_cache)
 
     def create_animated_background(self, theme, duration):
         """Create simple but effective animated background"""
-        def make_frame(t):
-            frame = np.zeros((self.video_config['height'], self.video_config['width'], 3), dtype=np.uint8)
-            
-            if theme in ["corporate", "legal"]:
-                # Professional blue gradient with moving elements
-                for y in range(self.video_config['height']):
-                    intensity = int(50 + 30 * math.sin(0.01 * y + t * 0.5))
-                    frame[y, :] = [intensity//3, intensity//2, intensity]
-                
-                # Add moving elements
-                for i in range(3):
-                    x = int(200 + 600 * (i/2) + 100 * math.sin(t + i))
-                    y = int(400 + 400 * math.sin(t * 0.3 + i))
-                    if 0 <= x < self.video_config['width'] and 0 <= y < self.video_config['height']:
-                        cv2.circle(frame, (x, y), 50, (100, 150, 255), -1)
-                        cv2.circle(frame, (x, y), 30, (150, 200, 255), -1)
-            
-            elif theme == "justice":
-                # Golden justice theme
-                for y in range(self.video_config['height']):
-                    intensity = int(60 + 20 * math.sin(0.005 * y + t * 0.3))
-                    frame[y, :] = [intensity//3, intensity//2, intensity]
-                
-                # Scales of justice animation
-                center_x = self.video_config['width'] // 2
-                scale_y = int(500 + 50 * math.sin(t))
-                cv2.rectangle(frame, (center_x-100, scale_y), (center_x+100, scale_y+20), (200, 180, 100), -1)
-                cv2.circle(frame, (center_x-60, scale_y), 40, (255, 215, 0), 3)
-                cv2.circle(frame, (center_x+60, scale_y), 40, (255, 215, 0), 3)
-            
-            elif theme == "cyber":
-                # Matrix-style background
-                frame[:, :] = [0, 20, 0]  # Dark green base
-                
-                # Digital rain effect
-                for x in range(0, self.video_config['width'], 30):
-                    drop_pos = int((t * 200 + x * 5) % (self.video_config['height'] + 200))
-                    if 0 <= drop_pos < self.video_config['height']:
-                        intensity = max(50, 255 - abs(drop_pos - self.video_config['height']//2) * 2)
-                        cv2.rectangle(frame, (x, drop_pos-20), (x+10, drop_pos+20), (0, intensity, 0), -1)
-            
-            elif theme == "tech":
-                # Tech/AI theme with neural network
-                frame[:, :] = [20, 20, 50]  # Dark blue
-                
-                # Animated connections
-                nodes = [(300, 400), (600, 300), (900, 500), (500, 800), (700, 1200)]
-                for i, (x1, y1) in enumerate(nodes[:4]):  # Limit to screen
-                    if y1 < self.video_config['height']:
-                        pulse_size = int(30 + 20 * math.sin(t * 2 + i))
-                        cv2.circle(frame, (x1, y1), pulse_size, (0, 200, 255), -1)
-                        cv2.circle(frame, (x1, y1), pulse_size//2, (100, 255, 255), -1)
-                        
-                        # Connections
-                        for j, (x2, y2) in enumerate(nodes[i+1:i+3], i+1):
-                            if j < len(nodes) and y2 < self.video_config['height']:
-                                cv2.line(frame, (x1, y1), (x2, y2), (0, 100, 200), 2)
-            
-            else:  # Default professional theme
-                # Simple gradient
-                for y in range(self.video_config['height']):
-                    intensity = int(40 + 20 * math.sin(0.002 * y))
-                    frame[y, :] = [intensity, intensity, intensity + 30]
-            
-            return frame
-        
+        from moviepy.video.VideoClip import VideoClip
+        make_frame = self.background_frame_source(theme, duration)
         return VideoClip(make_frame, duration=duration).set_fps(self.video_config['fps'])
 
-    def create_text_overlay(self, script, duration):
-        """Create text overlay with viral styling"""
+    def render_caption_sprite(self, sentence):
+        """Render one caption once into a tightly cropped RGBA sprite and its position"""
+        cache_key = (sentence, self.video_config['width'], self.video_config['height'])
+        if cache_key in self.caption_cache:
+            return self.caption_cache[cache_key]
+
+        width, height = self.video_config['width'], self.video_config['height']
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        alpha = np.zeros((height, width), dtype=np.uint8)
+
+        # Check for power words
+        has_power_word = any(power in sentence.upper() for power in self.power_words)
+
+        # Prepare text
+        text = sentence.strip().upper()
+        if len(text) > 50:
+            text = text[:47] + "..."
+
+        # Text styling
+        scale = layout_scale(width)
+        px = lambda value: scaled_px(value, scale)
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        font_scale = (1.8 if has_power_word else 1.5) * scale
+        color = (0, 255, 255) if has_power_word else (255, 255, 255)  # Yellow for power words
+        thickness = px(4 if has_power_word else 3)
+        outline_thickness = px(6 if has_power_word else 5)
+
+        # Multi-line text handling
+        words = text.split()
+        lines = []
+        current_line = ""
+
+        for word in words:
+            test_line = current_line + " " + word if current_line else word
+            text_size = cv2.getTextSize(test_line, font, font_scale, thickness)[0]
+
+            if text_size[0] < width - px(100):
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line)
+                current_line = word
+
+        if current_line:
+            lines.append(current_line)
+
+        # Draw text lines, coverage goes to the alpha plane
+        line_height = px(80)
+        start_y = height // 2 - (len(lines) * line_height // 2)
+
+        for j, line in enumerate(lines[:3]):  # Max 3 lines
+            text_size = cv2.getTextSize(line, font, font_scale, thickness)[0]
+            x = (width - text_size[0]) // 2
+            y = start_y + j * line_height
+
+            # Text outline
+            offset = px(3)
+            for dx, dy in [(-offset, -offset), (offset, offset), (-offset, offset), (offset, -offset)]:
+                cv2.putText(canvas, line, (x+dx, y+dy), font, font_scale, (0, 0, 0), outline_thickness, cv2.LINE_AA)
+                cv2.putText(alpha, line, (x+dx, y+dy), font, font_scale, 255, outline_thickness, cv2.LINE_AA)
+
+            # Main text
+            cv2.putText(canvas, line, (x, y), font, font_scale, color, thickness, cv2.LINE_AA)
+            cv2.putText(alpha, line, (x, y), font, font_scale, 255, thickness, cv2.LINE_AA)
+
+        sprite = crop_sprite(canvas, alpha)
+        self.caption_cache[cache_key] = sprite
+        return sprite
+
+    def caption_schedule(self, script, duration):
+        """(sentence, start, duration) of each caption shown for the script"""
         sentences = script.split('.')[:4]  # Limit to 4 sentences
         sentence_duration = duration / len(sentences)
-        text_clips = []
-        
-        for i, sentence in enumerate(sentences):
-            if not sentence.strip():
+        return [(sentence, i * sentence_duration, sentence_duration)
+                for i, sentence in enumerate(sentences) if sentence.strip()]
+
+    def caption_sprites(self, script, duration):
+        """Timed caption sprites for the first sentences of the script"""
+        sprites = []
+
+        for sentence, start, sentence_duration in self.caption_schedule(script, duration):
+            rendered = self.render_caption_sprite(sentence)
+            if rendered is None:
                 continue
-                
-            start_time = i * sentence_duration
-            
-            # Check for power words
-            has_power_word = any(power in sentence.upper() for power in self.power_words)
-            
-            def make_text_frame(t):
-                frame = np.zeros((self.video_config['height'], self.video_config['width'], 3), dtype=np.uint8)
-                
-                # Prepare text
-                text = sentence.strip().upper()
-                if len(text) > 50:
-                    text = text[:47] + "..."
-                
-                # Text styling
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 1.8 if has_power_word else 1.5
-                color = (0, 255, 255) if has_power_word else (255, 255, 255)  # Yellow for power words
-                thickness = 4 if has_power_word else 3
-                
-                # Multi-line text handling
-                words = text.split()
-                lines = []
-                current_line = ""
-                
-                for word in words:
-                    test_line = current_line + " " + word if current_line else word
-                    text_size = cv2.getTextSize(test_line, font, font_scale, thickness)[0]
-                    
-                    if text_size[0] < self.video_config['width'] - 100:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    lines.append(current_line)
-                
-                # Draw text lines
-                line_height = 80
-                start_y = self.video_config['height'] // 2 - (len(lines) * line_height // 2)
-                
-                for j, line in enumerate(lines[:3]):  # Max 3 lines
-                    text_size = cv2.getTextSize(line, font, font_scale, thickness)[0]
-                    x = (self.video_config['width'] - text_size[0]) // 2
-                    y = start_y + j * line_height
-                    
-                    # Text outline
-                    cv2.putText(frame, line, (x-3, y-3), font, font_scale, (0, 0, 0), thickness+2, cv2.LINE_AA)
-                    cv2.putText(frame, line, (x+3, y+3), font, font_scale, (0, 0, 0), thickness+2, cv2.LINE_AA)
-                    cv2.putText(frame, line, (x-3, y+3), font, font_scale, (0, 0, 0), thickness+2, cv2.LINE_AA)
-                    cv2.putText(frame, line, (x+3, y-3), font, font_scale, (0, 0, 0), thickness+2, cv2.LINE_AA)
-                    
-                    # Main text
-                    cv2.putText(frame, line, (x, y), font, font_scale, color, thickness, cv2.LINE_AA)
-                
-                return frame
-            
-            text_clip = VideoClip(make_text_frame, duration=sentence_duration).set_start(start_time)
+
+            rgba, x, y = rendered
+            sprites.append(CaptionSprite(rgba, x, y, start, sentence_duration))
+
+        return sprites
+
+    def create_text_overlay(self, script, duration):
+        """Create text overlay with viral styling"""
+        from moviepy.video.VideoClip import ImageClip
+        text_clips = []
+
+        for sprite in self.caption_sprites(script, duration):
+            mask = ImageClip(sprite.rgba[:, :, 3] / 255.0, ismask=True)
+            text_clip = (ImageClip(sprite.rgba[:, :, :3])
+                         .set_mask(mask)
+                         .set_position((sprite.x, sprite.y))
+                         .set_start(sprite.start)
+                         .set_duration(sprite.duration))
             text_clips.append(text_clip)
-        
+
         return text_clips
 
     def create_title_card(self, title, duration=3):
         """Create engaging title card"""
-        def make_title_frame(t):
-            frame = np.zeros((self.video_config['height'], self.video_config['width'], 3), dtype=np.uint8)
-            
-            # Animated background
-            for y in range(0, self.video_config['height'], 20):
-                intensity = int(30 + 20 * math.sin(0.1 * y + t * 3))
-                cv2.rectangle(frame, (0, y), (self.video_config['width'], y+10), (intensity, intensity//2, intensity*2), -1)
-            
-            # Title text
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            title_text = title.upper()
-            
-            # Handle long titles
-            if len(title_text) > 30:
-                words = title_text.split()
-                mid = len(words) // 2
-                line1 = " ".join(words[:mid])
-                line2 = " ".join(words[mid:])
-                lines = [line1, line2]
-            else:
-                lines = [title_text]
-            
-            # Draw title
-            font_scale = 2.0
-            thickness = 5
-            line_height = 120
-            start_y = self.video_config['height'] // 2 - (len(lines) * line_height // 2)
-            
-            for i, line in enumerate(lines):
-                text_size = cv2.getTextSize(line, font, font_scale, thickness)[0]
-                x = (self.video_config['width'] - text_size[0]) // 2
-                y = start_y + i * line_height
-                
-                # Glowing effect
-                for offset in range(8, 0, -1):
-                    alpha = 1.0 - (offset / 10.0)
-                    glow_color = (int(255 * alpha), int(255 * alpha), 0)
-                    cv2.putText(frame, line, (x, y), font, font_scale, glow_color, thickness + offset, cv2.LINE_AA)
-                
-                # Main text
-                cv2.putText(frame, line, (x, y), font, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
-            
-            return frame
-        
-        return VideoClip(make_title_frame, duration=duration).set_fps(self.video_config['fps'])
+        from moviepy.video.VideoClip import VideoClip
+        return VideoClip(self.title_frame_source(title), duration=duration).set_fps(self.video_config['fps'])
+
+    def title_frame_source(self, title):
+        """Return make_frame(t) for the animated title card"""
+        renderer = TitleCardRenderer(title, self.video_config['width'], self.video_config['height'],
+                                     self.title_cache)
+        return renderer.render
 
     def create_narration_audio(self, script, duration):
         """Create simple narration using beeps (placeholder for TTS)"""
+        from moviepy.audio.AudioClip import AudioArrayClip
+        pcm, sample_rate, _ = self.narration_audio(script, duration)
+        
+        # Straight from memory, no WAV written and decoded again by ffmpeg
+        samples = (pcm.astype(np.float32) / 32768).reshape(-1, 1)
+        return AudioArrayClip(samples, fps=sample_rate)
+
+    def narration_audio(self, script, duration, sample_rate=NARRATION_SAMPLE_RATE):
+        """Narration PCM, sample rate and cached WAV path, synthesized only on a cache miss"""
+        key = AudioCache.key(script, duration, sample_rate)
+        cached = self.audio_cache.get(key)
+        if cached is None:
+            cached = self.audio_cache.put(key, *self.synthesize_narration(script, duration))
+            cached = (cached, sample_rate)
+        narration_path = self.audio_cache.path(key)
+        return cached[0], cached[1], narration_path if os.path.exists(narration_path) else None
+
+    def synthesize_narration(self, script, duration):
+        """Synthesize the narration beeps as 16-bit mono PCM samples"""
+
         # Create simple audio track
-        sample_rate = 44100
+        sample_rate = NARRATION_SAMPLE_RATE
         samples = int(sample_rate * duration)
         
-        # Generate varied tones to simulate speech rhythm
-        t = np.linspace(0, duration, samples)
-        
         # Base frequency modulated by script length and content
         words = script.split()
         base_freq = 200 + len(words) % 100  # Vary by word count
-        
-        # Create speech-like rhythm
-        audio = np.zeros(samples)
         word_duration = duration / len(words)
         
-        for i, word in enumerate(words):
-            start_sample = int(i * word_duration * sample_rate)
-            end_sample = int((i + 1) * word_duration * sample_rate)
-            
-            # Vary frequency based on word characteristics
-            if any(power in word.upper() for power in self.power_words):
-                freq = base_freq * 1.5  # Higher pitch for power words
-                amplitude = 0.3
-            else:
-                freq = base_freq + (i % 3 - 1) * 50  # Vary pitch
-                amplitude = 0.2
-            
-            # Generate tone for this word
-            word_t = t[start_sample:end_sample]
-            if len(word_t) > 0:
-                word_audio = amplitude * np.sin(2 * np.pi * freq * word_t) * np.exp(-word_t/duration * 2)
-                audio[start_sample:end_sample] = word_audio
+        # Per-word pitch, loudness and sample boundaries, built once
+        index = np.arange(len(words))
+        is_power = np.array([any(power in word.upper() for power in self.power_words) for word in words])
+        freqs = np.where(is_power, base_freq * 1.5, base_freq + (index % 3 - 1) * 50)  # Higher pitch for power words
+        amplitudes = np.where(is_power, 0.3, 0.2).astype(np.float32)
+        word_ends = np.array([int((i + 1) * word_duration * sample_rate) for i in range(len(words))])
+        voiced = min(samples, int(word_ends[-1]))
+        word_samples = np.diff(np.minimum(word_ends, voiced), prepend=0)
         
-        # Add some variety with brief pauses
-        for i in range(0, len(audio), sample_rate // 2):
-            if i + sample_rate // 10 < len(audio):
-                audio[i:i + sample_rate // 10] *= 0.1  # Brief pause
+        # Per-sample tables; t = n * step matches np.linspace(0, duration, samples)
+        step = duration / (samples - 1) if samples > 1 else 0.0
+        cycles_per_sample = np.repeat(freqs * step, word_samples)
+        sample_amplitudes = np.repeat(amplitudes, word_samples)
+        decay = np.float32(-2 * step / duration)
         
-        # Normalize
-        if np.max(np.abs(audio)) > 0:
-            audio = audio / np.max(np.abs(audio)) * 0.8
+        # Speech-like rhythm: sin(2*pi*f*t) * exp(-2t/duration), evaluated in
+        # cache-sized blocks. Phases reach ~3e4 radians, which float32 cannot
+        # resolve, so whole cycles are dropped in float64 and the rest is float32.
+        audio = np.zeros(samples, dtype=np.float32)
+        block = 1 << 16
+        for block_start in range(0, voiced, block):
+            block_end = min(block_start + block, voiced)
+            n = np.arange(block_start, block_end, dtype=np.float64)
+            cycles = cycles_per_sample[block_start:block_end] * n
+            cycles -= np.floor(cycles)
+            wave = cycles.astype(np.float32)
+            wave *= np.float32(2 * np.pi)
+            np.sin(wave, out=wave)
+            envelope = n.astype(np.float32)
+            envelope *= decay
+            np.exp(envelope, out=envelope)
+            wave *= sample_amplitudes[block_start:block_end]
+            wave *= envelope
+            audio[block_start:block_end] = wave
         
-        # Save audio
-        temp_audio_path = os.path.join(self.audio_dir, f"narration_{int(datetime.now().timestamp())}.wav")
+        # Add some variety with brief pauses: the first tenth of a second of
+        # every half second, wherever the whole pause fits in the track
+        period, pause = sample_rate // 2, sample_rate // 10
+        pauses = (samples - pause - 1) // period + 1 if samples > pause else 0
+        full_periods = min(pauses, samples // period)
+        audio[:full_periods * period].reshape(full_periods, period)[:, :pause] *= np.float32(0.1)
+        if pauses > full_periods:
+            audio[full_periods * period:full_periods * period + pause] *= np.float32(0.1)
         
+        # Normalize
+        peak = max(float(audio.max(initial=0)), -float(audio.min(initial=0)))
+        if peak > 0:
+            audio *= np.float32(0.8 / peak)
+        
+        audio *= np.float32(32767)
+        pcm = audio.astype(np.int16)
+        pcm.flags.writeable = False
+        return pcm, sample_rate
+
+    def export_with_ffmpeg_pipe(self, timeline, output_path, pcm=None, sample_rate=44100, start=0, end=None,
+                                profiler=None):
+        """Encode timeline frames [start, end) and the narration PCM through one ffmpeg process"""
+        if profiler:
+            STAGE_RSS.reset()
+        export_started = time.perf_counter()
+        export_cpu = time.thread_time()
+        child_cpu = children_cpu_seconds()
+        layers = ('title_card', 'background', 'compositor')
+        frames_before = {name: profiler.frame_seconds(name) for name in layers} if profiler else {}
+        end = timeline.frame_count() if end is None else end
+        producer = FrameProducer(
+            timeline, start, end,
+            self.video_config['width'],
+            self.video_config['height'],
+            threads=self.render_threads(),
+            buffers=self.video_config['ring_buffers'],
+            profiles=self.cprofile
+        )
+        writer = FFmpegPipeWriter(
+            output_path,
+            self.video_config['width'],
+            self.video_config['height'],
+            self.video_config['fps'],
+            preset=self.video_config['encoder_preset'],
+            crf=self.video_config['crf'],
+            threads=self.video_config['encoder_threads']
+        )
+        writer.open(pcm, sample_rate)
         try:
-            from scipy.io import wavfile
-            wavfile.write(temp_audio_path, sample_rate, (audio * 32767).astype(np.int16))
-            return AudioFileClip(temp_audio_path)
-        except ImportError:
-            print("Scipy not available, creating silent audio")
-            return AudioFileClip("dummy").set_duration(duration).volumex(0)
+            for frame in producer:
+                writer.write(frame)
+        except BaseException:
+            writer.abort()
+            raise
+        stats = writer.close()
+        stats.update(render_threads=producer.threads, ring_buffers=len(producer.ring),
+                     producer_stall_seconds=round(producer.stall_seconds, 3))
+
+        if profiler:
+            # Producers render while this thread feeds ffmpeg: per-layer frame time comes from
+            # the histograms, encoding is the time not spent waiting for frames. The background
+            # renders inside the compositor, so compositing is what remains of the compositor's
+            peak_mb = STAGE_RSS.peak_mb()
+            spent = {name: [after - before for after, before in zip(profiler.frame_seconds(name), frames_before[name])]
+                     for name in layers}
+            profiler.add('title_card', *spent['title_card'], peak_mb=peak_mb)
+            profiler.add('background', *spent['background'], peak_mb=peak_mb)
+            profiler.add('compositing', spent['compositor'][0] - spent['background'][0],
+                         spent['compositor'][1] - spent['background'][1], peak_mb=peak_mb)
+            profiler.add('encoding', time.perf_counter() - export_started - producer.stall_seconds,
+                         time.thread_time() - export_cpu, children_cpu_seconds() - child_cpu, peak_mb)
+        return stats
+
+    def render_threads(self):
+        """Frame producer threads for one encode"""
+        if self.video_config['render_threads']:
+            return self.video_config['render_threads']
+        workers = self.video_config['workers'] if self.video_config['export_mode'] == 'segmented' else 1
+        return max(1, (os.cpu_count() or 1) // max(1, workers * self.concurrent_jobs))
+
+    def segment_ranges(self, timeline):
+        """Frame ranges of the title card and the fixed main-section slices"""
+        (title_start, title_frames, _), (main_start, main_frames, _) = timeline.segments
+        ranges = [(title_start, title_start + title_frames)]
+
+        # Slice count is fixed by config, never by worker count, so the
+        # encoded segments (and the final file) are identical for any -j
+        slices = max(1, min(self.video_config['render_segments'], main_frames))
+        bounds = [main_start + main_frames * i // slices for i in range(slices + 1)]
+        ranges += [(bounds[i], bounds[i + 1]) for i in range(slices)]
+        return [r for r in ranges if r[1] > r[0]]
+
+    def layer_keys(self, content_data, theme, topic=None):
+        """Cache key of every layer in RENDER_LAYERS from its declared inputs"""
+        return render_layer_keys({
+            'theme': theme,
+            'topic': topic,
+            'title': content_data['title'],
+            'script': content_data['script'],
+            'key_facts': content_data['key_facts'],
+            'render_config': RenderCache.render_config(self.video_config),
+            'duration': self.video_config['duration'],
+            'sample_rate': NARRATION_SAMPLE_RATE
+        })
 
-    def generate_video(self, topic=None, variation=None):
+    def segment_key(self, timeline, content_data, layer_keys, start, end):
+        """Cache key of a segment from only the layers and captions that reach its frames"""
+        (_, title_frames, _), (main_start, _, _) = timeline.segments
+        if end <= title_frames:
+            return RenderCache.digest('title', layer_keys['title_card'], start, end)
+
+        # Only captions on screen during this slice, so a script edit re-renders just its slices
+        fps = timeline.fps
+        times = [(index - main_start) / fps for index in range(start, end)]
+        main_duration = self.video_config['duration'] - 3
+        visible = [caption for caption in self.caption_schedule(content_data['script'], main_duration)
+                   if any(caption[1] <= t < caption[1] + caption[2] for t in times)]
+        return RenderCache.digest('main', layer_keys['background'], visible, start, end)
+
+    def export_segmented(self, timeline, content_data, theme, output_path, pcm=None, sample_rate=44100,
+                         profiler=None):
+        """Render dirty timeline segments in a process pool and concat all of them without re-encoding"""
+        started = time.perf_counter()
+        workers = max(1, self.video_config['workers'])
+        layer_keys = self.layer_keys(content_data, theme)
+
+        cached = self.render_cache.enabled
+        segment_dir = self.render_cache.segment_dir if cached else tempfile.mkdtemp(prefix='segments_', dir=self.video_dir)
+        try:
+            jobs = []
+            for i, (start, end) in enumerate(self.segment_ranges(timeline)):
+                if cached:
+                    name = self.segment_key(timeline, content_data, layer_keys, start, end)
+                else:
+                    name = f"segment_{i:03d}"
+                jobs.append({
+                    'video_config': dict(self.video_config),
+                    'content_data': content_data,
+                    'theme': theme,
+                    'start': start,
+                    'end': end,
+                    'path': os.path.join(segment_dir, f"{name}.mp4")
+                })
+
+            # Segments whose inputs are unchanged are reused as-is
+            pending = [job for job in jobs if not self.render_cache.hit(job['path'])]
+
+            with ExitStack() as building:
+                # Concurrent batch jobs often need the same segment: the first one encodes it while the
+                # others wait here and reuse it. Sorted so overlapping jobs never deadlock
+                pending = [job for job in sorted(pending, key=lambda job: job['path'])
+                           if not building.enter_context(self.render_cache.building(job['path']))]
+
+                if workers == 1 or len(pending) <= 1:
+                    # In-process segments render on this system's warm frame, caption and audio caches
+                    segment_stats = [render_segment(job, self) for job in pending]
+                else:
+                    # Pool workers trade the shared caches for parallel rendering
+                    if self.cprofile:
+                        pending = [dict(job, profile_path=job['path'][:-len('.mp4')] + f'.{os.getpid()}.prof')
+                                   for job in pending]
+                    if self.segment_pool:
+                        segment_stats = list(self.segment_pool.map(render_segment, pending))
+                    else:
+                        with ProcessPoolExecutor(max_workers=workers, mp_context=segment_pool_context()) as pool:
+                            segment_stats = list(pool.map(render_segment, pending))
+                    for job in pending:
+                        if job.get('profile_path') and os.path.exists(job['profile_path']):
+                            self.cprofile.add_dump(job['profile_path'])
+
+            for stats in segment_stats:
+                worker_profile = stats.pop('profile')
+                if profiler:
+                    profiler.merge(worker_profile)
+
+            with (profiler or StageProfiler()).stage('encoding'):
+                concat_segments([job['path'] for job in jobs], output_path, pcm, sample_rate)
+        finally:
+            if not cached:
+                shutil.rmtree(segment_dir, ignore_errors=True)
+
+        elapsed = time.perf_counter() - started
+        frames = sum(stats['frames'] for stats in segment_stats)
+        return {
+            'frames': frames,
+            'seconds': round(elapsed, 3),
+            'fps': round(frames / elapsed, 1) if elapsed else 0.0,
+            'workers': workers,
+            'cached_segments': len(jobs) - len(pending),
+            'segments': segment_stats,
+            'layer_timings_ms': LayerCompositor.merge_timing_reports(
+                [stats.pop('layer_timings_ms') for stats in segment_stats])
+        }
+
+    def cache_info(self):
+        """File count and size of each on-disk cache against its cap"""
+        caches = [
+            ('videos', self.video_dir, self.video_config['render_cache_mb']),
+            ('previews', self.preview_dir, self.video_config['render_cache_mb']),
+            ('segments', self.render_cache.segment_dir, self.video_config['render_cache_mb']),
+            ('audio', self.audio_dir, self.video_config['audio_cache_mb'])
+        ]
+        info = {}
+        for name, directory, cap_mb in caches:
+            sizes = [entry.stat().st_size for entry in os.scandir(directory) if entry.is_file()] \
+                if os.path.isdir(directory) else []
+            info[name] = {'files': len(sizes), 'size_mb': round(sum(sizes) / (1024 * 1024), 1), 'cap_mb': cap_mb}
+        return info
+
+    def prune_outputs(self):
+        """Apply the retention policy to output/ and logs/"""
+        folded = self.retention.compact_legacy_logs()
+        summary = self.retention.prune(
+            self.video_config['retention_days'],
+            intermediate_dirs=[self.audio_dir, self.render_cache.segment_dir, self.preview_dir],
+            intermediate_days=self.video_config['intermediate_retention_days'],
+            sweep_dirs=[self.output_dir, self.video_dir, self.thumbnail_dir]
+        )
+        summary['legacy_logs'] = folded
+        if summary['files']:
+            print(f"🧹 Pruned {summary['renders']} render(s), {summary['files']} file(s), {summary['freed_mb']} MB")
+        if folded:
+            print(f"🧹 Folded {folded} per-run log(s) into {self.retention.run_log_path}")
+        return summary
+
+    def get_theme(self, topic):
+        """Background theme for a topic"""
+        theme_mapping = {
+            'consumer_rights': 'corporate',
+            'labor_employment': 'corporate', 
+            'data_privacy': 'cyber',
+            'corporate_law': 'corporate',
+            'family_law': 'legal',
+            'criminal_law': 'justice',
+            'intellectual_property': 'legal',
+            'ai_legal_tools': 'tech'
+        }
+        return theme_mapping.get(topic, 'legal')
+
+    def timeline_layout(self):
+        """Frame ranges of the title card and main section, without building any layer"""
+        timeline = RenderTimeline(self.video_config['fps'])
+        timeline.add(3, None)
+        timeline.add(self.video_config['duration'] - 3, None)
+        return timeline
+
+    def build_timeline(self, content_data, theme, profiler=None):
+        """Title card followed by the composited main section"""
+        profiler = profiler or StageProfiler()
+        main_duration = self.video_config['duration'] - 3
+        with profiler.stage('title_card'):
+            title_card = self.title_frame_source(content_data['title'])
+        with profiler.stage('background'):
+            background = self.background_frame_source(theme, main_duration)
+        with profiler.stage('captions'):
+            captions = self.caption_sprites(content_data['script'], main_duration)
+        compositor = LayerCompositor(profiler.wrap_frames('background', background), captions,
+                                     self.video_config['width'], self.video_config['height'])
+
+        timeline = RenderTimeline(self.video_config['fps'])
+        timeline.add(3, profiler.wrap_frames('title_card', title_card))
+        timeline.add(main_duration, profiler.wrap_frames('compositor', compositor.make_frame))
+        return timeline, compositor
+
+    def generate_video(self, topic=None, variation=None, write_log=True):
         """Generate complete viral legal short"""
         try:
             # Get topic and content
@@ -377,70 +2277,106 @@ class ViralLegalShortsSystem:
             
             print(f"Generating video for {current_topic} (variation {current_variation})")
             
-            content_data = self.get_content_data(current_topic, current_variation)
+            profiler = StageProfiler()
+            with profiler.stage('content_lookup'):
+                content_data = self.get_content_data(current_topic, current_variation)
             
             # Determine theme
-            theme_mapping = {
-                'consumer_rights': 'corporate',
-                'labor_employment': 'corporate', 
-                'data_privacy': 'cyber',
-                'corporate_law': 'corporate',
-                'family_law': 'legal',
-                'criminal_law': 'justice',
-                'intellectual_property': 'legal',
-                'ai_legal_tools': 'tech'
-            }
-            theme = theme_mapping.get(current_topic, 'legal')
-            
-            print("Creating components...")
-            
-            # Create video components
-            title_card = self.create_title_card(content_data['title'], 3)
-            background = self.create_animated_background(theme, self.video_config['duration'] - 3)
-            text_overlays = self.create_text_overlay(content_data['script'], self.video_config['duration'] - 3)
-            
-            # Create narration audio
-            narration = self.create_narration_audio(content_data['script'], self.video_config['duration'])
-            
-            print("Compositing video...")
-            
-            # Combine video elements
-            main_video_clips = [background] + text_overlays
-            main_video = CompositeVideoClip(main_video_clips, size=(self.video_config['width'], self.video_config['height']))
-            
-            # Combine title card and main video
-            final_video = concatenate_videoclips([title_card, main_video])
+            theme = self.get_theme(current_topic)
             
-            # Add audio
-            if narration:
-                final_video = final_video.set_audio(narration)
-            
-            # Generate filename
+            # Outputs are named by a hash of everything that goes into them
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"legal_short_{current_topic}_{current_variation}_{timestamp}.mp4"
-            output_path = os.path.join(self.video_dir, output_filename)
+            render_key, output_path, marketing_path = self.output_paths(
+                current_topic, current_variation, content_data, theme)
+            narration_path = None
+            partial_path = output_path[:-len('.mp4')] + '.partial.mp4'
             
-            print(f"Exporting to {output_path}...")
+            export_stats = {}
+            layer_timings = {}
+            cache_hit = self.render_cache.hit(output_path, marketing_path)
+            if cache_hit:
+                print(f"♻️ Reusing cached render: {output_path}")
+                narration_path = self.audio_cache.path(
+                    AudioCache.key(content_data['script'], self.video_config['duration']))
+                if not os.path.exists(narration_path):
+                    narration_path = None
+            else:
+                print("Creating components...")
+                
+                # Create video components, segments build their own from the frame layout
+                if self.video_config['export_mode'] == 'segmented':
+                    timeline, compositor = self.timeline_layout(), None
+                else:
+                    timeline, compositor = self.build_timeline(content_data, theme, profiler)
+                
+                if self.video_config['export_mode'] == 'moviepy':
+                    from moviepy.video.VideoClip import VideoClip
+                    
+                    # Create narration audio
+                    with profiler.stage('narration'):
+                        narration = self.create_narration_audio(content_data['script'], self.video_config['duration'])
+                    
+                    print("Compositing video...")
+                    
+                    # Combine title card and main video
+                    final_video = VideoClip(lambda t: timeline.frame(int(round(t * timeline.fps))),
+                                            duration=self.video_config['duration']).set_fps(self.video_config['fps'])
+                    
+                    # Add audio
+                    if narration:
+                        final_video = final_video.set_audio(narration)
+                    
+                    print(f"Exporting to {output_path}...")
+                    
+                    # Export with proper settings
+                    with profiler.stage('encoding'):
+                        final_video.write_videofile(
+                            partial_path,
+                            fps=self.video_config['fps'],
+                            codec='libx264',
+                            audio_codec='aac' if narration else None,
+                            verbose=False,
+                            logger=None,
+                            temp_audiofile=partial_path + '.m4a',
+                            remove_temp=True
+                        )
+                else:
+                    with profiler.stage('narration'):
+                        pcm, sample_rate, narration_path = self.narration_audio(
+                            content_data['script'], self.video_config['duration'])
+                    
+                    if self.video_config['export_mode'] == 'segmented':
+                        print(f"Rendering segments with {self.video_config['workers']} worker(s): {output_path}...")
+                        export_stats = self.export_segmented(timeline, content_data, theme, partial_path,
+                                                             pcm, sample_rate, profiler)
+                    else:
+                        print(f"Streaming frames to ffmpeg: {output_path}...")
+                        export_stats = self.export_with_ffmpeg_pipe(timeline, partial_path, pcm, sample_rate,
+                                                                    profiler=profiler)
+                    print(f"🎞️ Encoded {export_stats['frames']} frames at {export_stats['fps']} fps")
+                
+                layer_timings = export_stats.pop('layer_timings_ms', None) or compositor.timing_report()
+                os.replace(partial_path, output_path)
+                
+                # Create marketing package
+                with profiler.stage('marketing'):
+                    self.write_marketing_package(content_data, current_topic, marketing_path)
+                
+                self.render_cache.evict()
             
-            # Export with proper settings
-            final_video.write_videofile(
-                output_path,
-                fps=self.video_config['fps'],
-                codec='libx264',
-                audio_codec='aac' if narration else None,
-                verbose=False,
-                logger=None,
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+            thumbnail_path = self.thumbnail_path(current_topic, current_variation, render_key)
+            if not os.path.exists(thumbnail_path):
+                with profiler.stage('thumbnail'):
+                    self.create_thumbnail(content_data['title'], thumbnail_path)
             
-            # Create marketing package
-            marketing = self.create_marketing_package(content_data, current_topic)
-            marketing_filename = f"marketing_{current_topic}_{current_variation}_{timestamp}.json"
-            marketing_path = os.path.join(self.output_dir, marketing_filename)
+            # Uploads run on the delivery pool, the caller moves on to the next render
+            if self.delivery and not self.preview:
+                self.delivery.submit(f"{current_topic}_{current_variation}",
+                                     [output_path, thumbnail_path, marketing_path])
             
-            with open(marketing_path, 'w') as f:
-                json.dump(marketing, f, indent=2)
+            if not self.preview:
+                self.retention.record(render_key, current_topic, current_variation, video=output_path,
+                                      marketing=marketing_path, thumbnail=thumbnail_path)
             
             # Log success
             log_data = {
@@ -449,25 +2385,35 @@ class ViralLegalShortsSystem:
                 'variation': current_variation,
                 'video_path': output_path,
                 'marketing_path': marketing_path,
+                'thumbnail_path': thumbnail_path,
+                'narration_path': narration_path,
+                'render_key': render_key,
+                'layers': self.layer_keys(content_data, theme, current_topic),
+                'cache_hit': cache_hit,
                 'script_length': len(content_data['script'].split()),
                 'duration': self.video_config['duration'],
                 'theme': theme,
-                'key_facts': content_data['key_facts']
+                'key_facts': content_data['key_facts'],
+                'layer_timings_ms': layer_timings,
+                'export': export_stats,
+                'delivery': 'queued' if self.delivery else None,
+                'profile': profiler.report()
             }
             
-            log_path = os.path.join(self.logs_dir, f"success_log_{timestamp}.json")
-            with open(log_path, 'w') as f:
-                json.dump(log_data, f, indent=2)
-            
             print(f"✅ SUCCESS! Video generated: {output_path}")
             print(f"📋 Marketing package: {marketing_path}")
-            print(f"📊 Log: {log_path}")
+            
+            if write_log:
+                print(f"📊 Log: {self.retention.log_run('video', log_data)}")
+            if layer_timings:
+                print(f"⏱️ Layer timings (ms/frame): {layer_timings}")
             
             return {
                 'success': True,
                 'video_path': output_path,
                 'marketing_path': marketing_path,
-                'content_data': content_data
+                'content_data': content_data,
+                'log': log_data
             }
             
         except Exception as e:
@@ -481,11 +2427,174 @@ class ViralLegalShortsSystem:
                 'variation': current_variation if 'current_variation' in locals() else 'unknown'
             }
             
-            error_path = os.path.join(self.logs_dir, f"error_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-            with open(error_path, 'w') as f:
-                json.dump(error_log, f, indent=2)
+            if write_log:
+                self.retention.log_run('error', error_log)
             
-            return {'success': False, 'error': str(e)}
+            return {'success': False, 'error': str(e), 'log': error_log}
+
+    def output_paths(self, topic, variation, content_data, theme):
+        """Render key of a video and the video and marketing paths named after it"""
+        layer_keys = self.layer_keys(content_data, theme, topic)
+        render_key = RenderCache.digest('video', layer_keys['final'], layer_keys['marketing'])
+        if self.preview:
+            return (render_key, os.path.join(self.preview_dir, f"preview_{topic}_{variation}_{render_key}.mp4"),
+                    os.path.join(self.preview_dir, f"marketing_{topic}_{variation}_{render_key}.json"))
+        output_filename = f"legal_short_{topic}_{variation}_{render_key}.mp4"
+        marketing_filename = f"marketing_{topic}_{variation}_{render_key}.json"
+        return (render_key, os.path.join(self.video_dir, output_filename),
+                os.path.join(self.output_dir, marketing_filename))
+
+    def thumbnail_path(self, topic, variation, render_key):
+        return os.path.join(self.preview_dir if self.preview else self.thumbnail_dir,
+                            f"thumbnail_{topic}_{variation}_{render_key}.jpg")
+
+    def create_thumbnail(self, title, thumbnail_path):
+        """Save a title card frame as the video's JPEG thumbnail"""
+        frame = TitleCardRenderer(title, self.video_config['width'], self.video_config['height'],
+                                  self.title_cache).render(1.0)
+        partial_path = thumbnail_path[:-len('.jpg')] + '.partial.jpg'
+        cv2.imwrite(partial_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+        os.replace(partial_path, thumbnail_path)
+
+    def enable_delivery(self, url=None, token=None):
+        """Upload finished videos to url (or DELIVERY_URL) in the background"""
+        url = url or os.environ.get('DELIVERY_URL')
+        if not url:
+            return False
+        if self.preview:
+            print("👀 Preview drafts are not delivered")
+            return False
+        try:
+            client = DeliveryClient(
+                url,
+                token or os.environ.get('DELIVERY_TOKEN'),
+                chunk_mb=float(os.environ.get('DELIVERY_CHUNK_MB', 8)),
+                retries=int(os.environ.get('DELIVERY_RETRIES', 5)),
+                max_backoff=float(os.environ.get('DELIVERY_MAX_BACKOFF', 30))
+            )
+        except ImportError:
+            print("Requests not available, delivery disabled")
+            return False
+        self.delivery = DeliveryQueue(client, int(os.environ.get('DELIVERY_WORKERS', 4)))
+        print(f"📤 Delivering to {client.url}")
+        return True
+
+    def write_marketing_package(self, content_data, topic, marketing_path):
+        """Write a marketing package next to its video, atomically"""
+        partial_path = marketing_path + '.partial'
+        with open(partial_path, 'w') as f:
+            json.dump(self.create_marketing_package(content_data, topic), f, indent=2)
+        os.replace(partial_path, marketing_path)
+
+    def generate_marketing(self, jobs):
+        """Marketing packages for many topic variations, without any video or audio work"""
+        started = time.perf_counter()
+        self.content_store.preload((job['topic'], job['variation']) for job in jobs)
+        jobs = self.normalize_jobs(jobs)
+        entries = []
+        for job in jobs:
+            content_data = self.get_content_data(job['topic'], job['variation'])
+            render_key, video_path, marketing_path = self.output_paths(
+                job['topic'], job['variation'], content_data, self.get_theme(job['topic']))
+            self.write_marketing_package(content_data, job['topic'], marketing_path)
+            if not self.preview:
+                self.retention.record(render_key, job['topic'], job['variation'], marketing=marketing_path)
+            entries.append({
+                'topic': job['topic'],
+                'variation': job['variation'],
+                'dates': job.get('dates', []),
+                'marketing_path': marketing_path,
+                'video_exists': os.path.exists(video_path)
+            })
+        print(f"📋 {len(entries)} marketing package(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return entries
+
+    def batch_jobs_for_dates(self, start_date, end_date):
+        """Unique (topic, variation) jobs scheduled between two dates, inclusive"""
+        jobs = {}
+        date = start_date
+        while date <= end_date:
+            topic, variation = self.get_topic_for_date(date)
+            job = jobs.setdefault((topic, variation), {'topic': topic, 'variation': variation, 'dates': []})
+            job['dates'].append(date.strftime("%Y-%m-%d"))
+            date += timedelta(days=1)
+        return list(jobs.values())
+
+    def normalize_jobs(self, jobs):
+        """Merge jobs that render the same content, keeping first-seen order and all their dates"""
+        merged = {}
+        for job in jobs:
+            key = (job['topic'], self.resolve_variation(job['topic'], job['variation']))
+            entry = merged.setdefault(key, {'topic': key[0], 'variation': key[1], 'dates': []})
+            entry['dates'] = sorted(set(entry['dates']) | set(job.get('dates', [])))
+        return list(merged.values())
+
+    def generate_batch(self, jobs, workers=2):
+        """Render many videos with shared caches and write one manifest for the batch"""
+        started = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Lazy stores read only the scripts this batch renders
+        self.content_store.preload((job['topic'], job['variation']) for job in jobs)
+        
+        # Concurrent jobs for the same content would race on the same output files
+        jobs = self.normalize_jobs(jobs)
+        print(f"📦 Batch of {len(jobs)} video(s) on {workers} worker(s)")
+
+        def run_job(job):
+            job_started = time.perf_counter()
+            result = self.generate_video(job['topic'], job['variation'], write_log=False)
+            entry = {
+                'topic': job['topic'],
+                'variation': job['variation'],
+                'dates': job.get('dates', []),
+                'success': result['success'],
+                'seconds': round(time.perf_counter() - job_started, 3)
+            }
+            if result['success']:
+                entry.update(video_path=result['video_path'], marketing_path=result['marketing_path'],
+                             theme=result['log']['theme'], cache_hit=result['log']['cache_hit'],
+                             export=result['log']['export'], layer_timings_ms=result['log']['layer_timings_ms'],
+                             stages=result['log']['profile']['stages'])
+            else:
+                entry['error'] = result['error']
+            return entry
+
+        # Jobs share one segment pool, started before any render thread, and split the cores
+        pooled = self.video_config['export_mode'] == 'segmented' and self.video_config['workers'] > 1
+        if pooled:
+            self.segment_pool = ProcessPoolExecutor(self.video_config['workers'], mp_context=segment_pool_context())
+        self.concurrent_jobs = max(1, min(workers, len(jobs)))
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                entries = list(pool.map(self.cprofile.wrap(run_job) if self.cprofile else run_job, jobs))
+        finally:
+            if pooled:
+                self.segment_pool.shutdown()
+                self.segment_pool = None
+            self.concurrent_jobs = 1
+        
+        # Earlier videos have been uploading while later ones rendered
+        delivery = self.delivery.wait() if self.delivery else []
+        failed_uploads = {result['label'] for result in delivery if not result['success']}
+        for entry in entries:
+            if f"{entry['topic']}_{entry['variation']}" in failed_uploads:
+                entry.update(success=False, error="delivery failed")
+
+        manifest = {
+            'timestamp': timestamp,
+            'jobs': entries,
+            'succeeded': sum(1 for entry in entries if entry['success']),
+            'failed': sum(1 for entry in entries if not entry['success']),
+            'total_seconds': round(time.perf_counter() - started, 3),
+            'frame_cache': self.frame_cache.stats(),
+            'content_store': self.content_store.stats(),
+            'delivery': delivery,
+            'video_config': self.video_config
+        }
+
+        print(f"📊 Batch manifest: {self.retention.log_run('batch', manifest)}")
+        return manifest
 
     def create_marketing_package(self, content_data, topic):
         """Create marketing materials"""
@@ -517,27 +2626,162 @@ Key Facts:
             'key_facts': content_data['key_facts']
         }
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate viral legal YouTube Shorts")
+    parser.add_argument('--auto', action='store_true', help="Automated mode, exit code reflects success")
+    parser.add_argument('--workers', type=int, help="Render segments in parallel with N worker processes")
+    parser.add_argument('--batch', action='store_true', help="Render a date range or job list in one run")
+    parser.add_argument('--from', dest='date_from', help="Batch start date (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='date_to', help="Batch end date (YYYY-MM-DD), defaults to --from")
+    parser.add_argument('--jobs', help="Batch jobs as comma-separated topic:variation pairs")
+    parser.add_argument('--batch-workers', type=int, default=2, help="Videos rendered concurrently in a batch")
+    parser.add_argument('--content', help="Script store: topics.json, a .jsonl file or a SQLite .db")
+    parser.add_argument('--lazy-content', action='store_true',
+                        help="Index the store up front but load scripts only when rendered")
+    parser.add_argument('--preview', nargs='?', type=float, const=0, metavar='SCALE',
+                        help="Fast low-resolution draft, SCALE of full size (default 0.25)")
+    parser.add_argument('--preview-fps', type=int, help="Frame rate of --preview drafts (default 15)")
+    parser.add_argument('--deliver', metavar='URL', help="Upload renders to this endpoint (default $DELIVERY_URL)")
+    parser.add_argument('--marketing-only', action='store_true',
+                        help="Only (re)write marketing packages, for today or the --jobs/--from range")
+    parser.add_argument('--list-topics', action='store_true', help="Show topics, variations and the next week's schedule")
+    parser.add_argument('--cache-info', action='store_true', help="Show on-disk cache usage")
+    parser.add_argument('--prune', action='store_true',
+                        help="Only apply the retention policy to output/ and logs/ (also runs after each render)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record a cProfile of the run to logs/ (view with snakeviz or gprof2dot)")
+    return parser.parse_args(argv)
+
+def batch_jobs_from_args(system, args):
+    """Build the batch job list from --jobs or --from/--to"""
+    if args.jobs:
+        jobs = []
+        for item in args.jobs.split(','):
+            topic, _, variation = item.strip().partition(':')
+            jobs.append({'topic': topic, 'variation': int(variation or 0)})
+        return jobs
+
+    if not args.date_from:
+        raise ValueError("--batch needs --jobs or --from")
+    start_date = datetime.strptime(args.date_from, "%Y-%m-%d")
+    end_date = datetime.strptime(args.date_to, "%Y-%m-%d") if args.date_to else start_date
+    return system.batch_jobs_for_dates(start_date, end_date)
+
+def dump_cprofile(profile, logs_dir, collector=None):
+    """Write cProfile stats of the main and worker threads to logs/ for snakeviz, flameprof or gprof2dot"""
+    profile.disable()
+    stats = (collector or ProfileCollector()).merged(profile)
+    profile_path = os.path.join(logs_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+    stats.dump_stats(profile_path)
+    print(f"🔬 cProfile written to {profile_path}")
+    stats.sort_stats('cumulative').print_stats(15)
+
+def wait_for_delivery(system):
+    """Wait for queued uploads, report and log them, and return False if any failed"""
+    if not system.delivery:
+        return True
+    succeeded = True
+    results = system.delivery.wait()
+    for result in results:
+        for upload in result['files']:
+            if upload['success']:
+                print(f"📤 Uploaded {os.path.basename(upload['path'])} ({upload['bytes']} bytes, {upload['seconds']}s)")
+            else:
+                print(f"❌ Upload of {os.path.basename(upload['path'])} failed: {upload['error']}")
+        succeeded = succeeded and result['success']
+    # The video's own line says 'queued', this one records how each file went
+    if results:
+        system.retention.log_run('delivery', {'timestamp': datetime.now().isoformat(), 'success': succeeded,
+                                              'results': results})
+    return succeeded
+
+def run(system, args):
+    """Run the mode selected on the command line"""
+    if args.preview is not None:
+        system.apply_preview(args.preview, args.preview_fps)
+        print(f"👀 Preview render at {system.video_config['width']}x{system.video_config['height']}, "
+              f"{system.video_config['fps']} fps")
+    
+    if args.workers:
+        system.video_config['export_mode'] = 'segmented'
+        system.video_config['workers'] = args.workers
+    
+    if args.list_topics:
+        store = system.content_store
+        for topic in system.topics:
+            print(f"{topic:<24} {store.variation_count(topic)} variation(s)  theme {system.get_theme(topic)}")
+        today = datetime.now()
+        for offset in range(7):
+            date = today + timedelta(days=offset)
+            topic, variation = system.get_topic_for_date(date)
+            print(f"📅 {date.strftime('%Y-%m-%d')}  {topic} (variation {variation})")
+    elif args.marketing_only:
+        if args.jobs or args.date_from:
+            jobs = batch_jobs_from_args(system, args)
+        else:
+            topic, variation = system.get_current_topic()
+            jobs = [{'topic': topic, 'variation': variation}]
+        for entry in system.generate_marketing(jobs):
+            print(f"  {entry['topic']} (variation {entry['variation']}): {entry['marketing_path']}")
+    elif args.cache_info:
+        for name, info in system.cache_info().items():
+            print(f"🗄️ {name:<9} {info['files']:5d} file(s)  {info['size_mb']:8.1f} MB of {info['cap_mb']} MB")
+        info = system.retention.stats()
+        print(f"🗂️ indexed   {info['renders']:5d} render(s) {info['size_mb']:8.1f} MB, "
+              f"run log {info['run_log_mb']} MB of {system.video_config['run_log_mb']} MB")
+    elif args.prune:
+        system.prune_outputs()
+    elif args.batch:
+        system.enable_delivery(args.deliver)
+        manifest = system.generate_batch(batch_jobs_from_args(system, args), args.batch_workers)
+        system.prune_outputs()
+        if manifest['failed']:
+            print(f"❌ Batch finished with {manifest['failed']} failure(s)")
+            sys.exit(1)
+        print("✅ Batch generation completed!")
+    elif args.auto:
+        print("🤖 Running in automated mode...")
+        system.enable_delivery(args.deliver)
+        result = system.generate_video()
+        if result['success'] and not wait_for_delivery(system):
+            result['success'] = False
+        system.prune_outputs()
+        if result['success']:
+            print("✅ Automated generation completed!")
+            sys.exit(0)
+        else:
+            print("❌ Automated generation failed!")
+            sys.exit(1)
+    else:
+        # Manual generation for testing
+        system.enable_delivery(args.deliver)
+        result = system.generate_video()
+        if result['success'] and not wait_for_delivery(system):
+            result['success'] = False
+        system.prune_outputs()
+        if result['success']:
+            print("✅ Manual generation completed!")
+        else:
+            print("❌ Manual generation failed!")
+
 def main():
     """Main entry point"""
     try:
-        system = ViralLegalShortsSystem()
+        args = parse_args()
+        system = ViralLegalShortsSystem(args.content, args.lazy_content)
         
-        if len(sys.argv) > 1 and sys.argv[1] == '--auto':
-            print("🤖 Running in automated mode...")
-            result = system.generate_video()
-            if result['success']:
-                print("✅ Automated generation completed!")
-                sys.exit(0)
-            else:
-                print("❌ Automated generation failed!")
-                sys.exit(1)
+        if args.profile:
+            import cProfile
+            system.cprofile = ProfileCollector()
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                run(system, args)
+            finally:
+                dump_cprofile(profile, system.logs_dir, system.cprofile)
         else:
-            # Manual generation for testing
-            result = system.generate_video()
-            if result['success']:
-                print("✅ Manual generation completed!")
-            else:
-                print("❌ Manual generation failed!")
+            run(system, args)
                 
     except Exception as e:
         print(f"💥 Fatal error: {e}")
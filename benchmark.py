@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import shutil
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from autopilot import (AnimatedBackgroundRenderer, AudioCache, DeliveryClient, DeliveryQueue, FrameCache,
+                       LayerCompositor, RenderCache, RetentionManager, TitleCardRenderer, ViralLegalShortsSystem,
+                       peak_rss_mb)
+
+THEMES = ["corporate", "legal", "justice", "cyber", "tech", "default"]
+
+# Modules `import autopilot` must leave for the first rendered frame
+HEAVY_MODULES = ('numpy', 'cv2', 'moviepy', 'scipy', 'imageio')
+
+# Suite metrics that fail a --compare run when they regress
+GATED_METRICS = ('p50_ms', 'seconds', 'peak_mb')
+
+
+def legacy_background_frame(theme, t, width, height):
+    """Reference per-row loop implementation of the animated background"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+    if theme in ["corporate", "legal"]:
+        for y in range(height):
+            intensity = int(50 + 30 * math.sin(0.01 * y + t * 0.5))
+            frame[y, :] = [intensity//3, intensity//2, intensity]
+        for i in range(3):
+            x = int(200 + 600 * (i/2) + 100 * math.sin(t + i))
+            y = int(400 + 400 * math.sin(t * 0.3 + i))
+            if 0 <= x < width and 0 <= y < height:
+                cv2.circle(frame, (x, y), 50, (100, 150, 255), -1)
+                cv2.circle(frame, (x, y), 30, (150, 200, 255), -1)
+
+    elif theme == "justice":
+        for y in range(height):
+            intensity = int(60 + 20 * math.sin(0.005 * y + t * 0.3))
+            frame[y, :] = [intensity//3, intensity//2, intensity]
+        center_x = width // 2
+        scale_y = int(500 + 50 * math.sin(t))
+        cv2.rectangle(frame, (center_x-100, scale_y), (center_x+100, scale_y+20), (200, 180, 100), -1)
+        cv2.circle(frame, (center_x-60, scale_y), 40, (255, 215, 0), 3)
+        cv2.circle(frame, (center_x+60, scale_y), 40, (255, 215, 0), 3)
+
+    elif theme == "cyber":
+        frame[:, :] = [0, 20, 0]
+        for x in range(0, width, 30):
+            drop_pos = int((t * 200 + x * 5) % (height + 200))
+            if 0 <= drop_pos < height:
+                intensity = max(50, 255 - abs(drop_pos - height//2) * 2)
+                cv2.rectangle(frame, (x, drop_pos-20), (x+10, drop_pos+20), (0, intensity, 0), -1)
+
+    elif theme == "tech":
+        frame[:, :] = [20, 20, 50]
+        nodes = [(300, 400), (600, 300), (900, 500), (500, 800), (700, 1200)]
+        for i, (x1, y1) in enumerate(nodes[:4]):
+            if y1 < height:
+                pulse_size = int(30 + 20 * math.sin(t * 2 + i))
+                cv2.circle(frame, (x1, y1), pulse_size, (0, 200, 255), -1)
+                cv2.circle(frame, (x1, y1), pulse_size//2, (100, 255, 255), -1)
+                for j, (x2, y2) in enumerate(nodes[i+1:i+3], i+1):
+                    if j < len(nodes) and y2 < height:
+                        cv2.line(frame, (x1, y1), (x2, y2), (0, 100, 200), 2)
+
+    else:
+        for y in range(height):
+            intensity = int(40 + 20 * math.sin(0.002 * y))
+            frame[y, :] = [intensity, intensity, intensity + 30]
+
+    return frame
+
+
+def legacy_title_frame(title, t, width, height):
+    """Reference eight-pass glow implementation of the title card"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for y in range(0, height, 20):
+        intensity = int(30 + 20 * math.sin(0.1 * y + t * 3))
+        cv2.rectangle(frame, (0, y), (width, y+10), (intensity, intensity//2, intensity*2), -1)
+
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    title_text = title.upper()
+    if len(title_text) > 30:
+        words = title_text.split()
+        mid = len(words) // 2
+        lines = [" ".join(words[:mid]), " ".join(words[mid:])]
+    else:
+        lines = [title_text]
+
+    font_scale = 2.0
+    thickness = 5
+    line_height = 120
+    start_y = height // 2 - (len(lines) * line_height // 2)
+    for i, line in enumerate(lines):
+        text_size = cv2.getTextSize(line, font, font_scale, thickness)[0]
+        x = (width - text_size[0]) // 2
+        y = start_y + i * line_height
+        for offset in range(8, 0, -1):
+            alpha = 1.0 - (offset / 10.0)
+            glow_color = (int(255 * alpha), int(255 * alpha), 0)
+            cv2.putText(frame, line, (x, y), font, font_scale, glow_color, thickness + offset, cv2.LINE_AA)
+        cv2.putText(frame, line, (x, y), font, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
+    return frame
+
+
+def legacy_narration(script, duration, power_words):
+    """Reference per-word loop implementation of the narration synthesis"""
+    sample_rate = 44100
+    samples = int(sample_rate * duration)
+    t = np.linspace(0, duration, samples)
+    words = script.split()
+    base_freq = 200 + len(words) % 100
+    audio = np.zeros(samples)
+    word_duration = duration / len(words)
+
+    for i, word in enumerate(words):
+        start_sample = int(i * word_duration * sample_rate)
+        end_sample = int((i + 1) * word_duration * sample_rate)
+        if any(power in word.upper() for power in power_words):
+            freq = base_freq * 1.5
+            amplitude = 0.3
+        else:
+            freq = base_freq + (i % 3 - 1) * 50
+            amplitude = 0.2
+        word_t = t[start_sample:end_sample]
+        if len(word_t) > 0:
+            audio[start_sample:end_sample] = amplitude * np.sin(2 * np.pi * freq * word_t) * np.exp(-word_t/duration * 2)
+
+    for i in range(0, len(audio), sample_rate // 2):
+        if i + sample_rate // 10 < len(audio):
+            audio[i:i + sample_rate // 10] *= 0.1
+
+    if np.max(np.abs(audio)) > 0:
+        audio = audio / np.max(np.abs(audio)) * 0.8
+    return (audio * 32767).astype(np.int16)
+
+
+def time_frames(make_frame, times):
+    """Return mean milliseconds per frame for make_frame over times"""
+    start = time.perf_counter()
+    for t in times:
+        make_frame(t)
+    return (time.perf_counter() - start) * 1000 / len(times)
+
+
+def benchmark_background(frames=60):
+    """Compare legacy and precomputed background engines per theme"""
+    config = ViralLegalShortsSystem().video_config
+    width, height, fps = config['width'], config['height'], config['fps']
+    times = [n / fps for n in range(frames)]
+
+    print(f"Background engine, {width}x{height}, {frames} frames per theme")
+    for theme in THEMES:
+        renderer = AnimatedBackgroundRenderer(theme, width, height)
+
+        # Outputs must stay pixel-identical to the legacy loop
+        for t in times:
+            if not np.array_equal(renderer.render(t), legacy_background_frame(theme, t, width, height)):
+                print(f"❌ {theme}: frame at t={t:.3f} differs from legacy output")
+                return False
+
+        legacy_ms = time_frames(lambda t: legacy_background_frame(theme, t, width, height), times)
+        engine_ms = time_frames(renderer.render, times)
+        print(f"  {theme:<10} legacy {legacy_ms:7.2f} ms/frame  engine {engine_ms:7.2f} ms/frame  "
+              f"speedup {legacy_ms / engine_ms:5.1f}x")
+    return True
+
+
+def benchmark_frame_cache(duration=60):
+    """Time full-length background clips with and without the loop cache"""
+    config = ViralLegalShortsSystem().video_config
+    width, height, fps = config['width'], config['height'], config['fps']
+    times = [n / fps for n in range(int(duration * fps))]
+
+    print(f"Background loop cache, {duration}s clip, {config['frame_cache_mb']} MB cap")
+    for theme in THEMES:
+        renderer = AnimatedBackgroundRenderer(theme, width, height)
+        cache = FrameCache(config['frame_cache_mb'])
+        uncached_ms = time_frames(renderer.render, times)
+        cached_ms = time_frames(renderer.frame_source(fps, duration, cache), times)
+        stats = cache.stats()
+        print(f"  {theme:<10} uncached {uncached_ms:6.2f} ms/frame  cached {cached_ms:6.2f} ms/frame  "
+              f"({stats['frames']} frames, {stats['used_mb']} MB, {stats['hits']} hits)")
+
+
+def benchmark_title_card(frames=90):
+    """Compare legacy and sprite-based title card frames/sec"""
+    system = ViralLegalShortsSystem()
+    config = system.video_config
+    width, height, fps = config['width'], config['height'], config['fps']
+    title = system.get_content_data("consumer_rights", 0)['title']
+    times = [n / fps for n in range(frames)]
+
+    start = time.perf_counter()
+    renderer = TitleCardRenderer(title, width, height)
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    legacy_ms = time_frames(lambda t: legacy_title_frame(title, t, width, height), times)
+    sprite_ms = time_frames(renderer.render, times)
+    print(f"Title card, {width}x{height}, {frames} frames")
+    print(f"  legacy {1000 / legacy_ms:7.1f} fps  sprite {1000 / sprite_ms:7.1f} fps  "
+          f"speedup {legacy_ms / sprite_ms:5.1f}x  (sprite setup {setup_ms:.1f} ms)")
+
+
+def benchmark_narration(word_counts=(10, 40, 160, 640), durations=(15, 60)):
+    """Compare legacy and vectorized narration synthesis across script lengths"""
+    system = ViralLegalShortsSystem()
+    vocabulary = " ".join(system.get_content_data(topic, 0)['script'] for topic in system.topics).split()
+
+    print("Narration synthesis")
+    for words in word_counts:
+        script = " ".join(vocabulary[i % len(vocabulary)] for i in range(words))
+        for duration in durations:
+            start = time.perf_counter()
+            reference = legacy_narration(script, duration, system.power_words)
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            pcm, _ = system.synthesize_narration(script, duration)
+            vectorized_ms = (time.perf_counter() - start) * 1000
+
+            # Documented tolerance: at most one int16 step from the legacy output
+            max_error = int(np.abs(reference.astype(np.int32) - pcm).max())
+            if max_error > 1:
+                print(f"❌ {words} words / {duration}s: differs from legacy output by {max_error} LSB")
+                return False
+            print(f"  {words:4d} words {duration:3d}s  legacy {legacy_ms:7.1f} ms  vectorized {vectorized_ms:6.1f} ms  "
+                  f"max error {max_error} LSB")
+    return True
+
+
+class StubUploadHandler(BaseHTTPRequestHandler):
+    """Local delivery endpoint speaking DeliveryClient's protocol, failing chunks on a fixed pattern"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        for name, value in dict(headers or {}, **{'Content-Type': 'application/json'}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        meta = json.loads(self.body())
+        stub = self.server
+        with stub.lock:
+            if stub.throttle:
+                # Far longer than the client may wait (max_backoff), yet short enough that a
+                # regression fails benchmark_delivery's deadline instead of hanging the run
+                stub.throttle -= 1
+                stub.stats['throttled'] += 1
+                return self.reply(503, {'error': 'busy'}, {'Retry-After': '60'})
+            upload_id = stub.by_sha.setdefault(meta['sha256'], str(len(stub.uploads)))
+            upload = stub.uploads.setdefault(upload_id, {'meta': meta, 'data': bytearray()})
+        self.reply(200, {'id': upload_id, 'offset': len(upload['data'])})
+
+    def do_GET(self):
+        self.reply(200, {'offset': len(self.server.uploads[self.path.rsplit('/', 1)[1]]['data'])})
+
+    def do_PUT(self):
+        stub = self.server
+        upload = stub.uploads[self.path.rsplit('/', 1)[1]]
+        chunk = self.body()
+        start = int(re.match(r'bytes (\d+)-', self.headers['Content-Range']).group(1))
+        with stub.lock:
+            if start != len(upload['data']):
+                stub.stats['conflicts'] += 1
+                return self.reply(409, {'offset': len(upload['data'])})
+            stub.puts += 1
+            if stub.puts % 3 == 0:
+                # Every other failure keeps the chunk, so the retry meets a 409 and has to resume
+                if stub.puts % 2 == 0:
+                    upload['data'] += chunk
+                stub.stats['failed'] += 1
+                return self.reply(503, {'error': 'try later'})
+            upload['data'] += chunk
+        self.reply(200, {'offset': len(upload['data'])})
+
+
+def benchmark_delivery(files=3, size_mb=1.0):
+    """Upload through a faulty local stub and check retries, 409 resumes and Retry-After clamping"""
+    try:
+        client_args = {'chunk_mb': size_mb / 8, 'retries': 6, 'backoff': 0.01, 'max_backoff': 0.05}
+        DeliveryClient('http://127.0.0.1', **client_args)
+    except ImportError:
+        print("Delivery check skipped, requests not installed")
+        return True
+
+    stub = ThreadingHTTPServer(('127.0.0.1', 0), StubUploadHandler)
+    stub.uploads, stub.by_sha, stub.lock, stub.puts, stub.throttle = {}, {}, threading.Lock(), 0, 1
+    stub.stats = {'throttled': 0, 'failed': 0, 'conflicts': 0}
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    workdir = tempfile.mkdtemp(prefix='autopilot_delivery_')
+    try:
+        rng = np.random.default_rng(0)
+        contents = {}
+        for i in range(files):
+            path = os.path.join(workdir, f"video_{i}.mp4")
+            contents[path] = rng.bytes(int(size_mb * 1024 * 1024))
+            with open(path, 'wb') as f:
+                f.write(contents[path])
+
+        # The first file was half uploaded by an earlier run
+        first = next(iter(contents))
+        half = len(contents[first]) // 2
+        stub.by_sha[hashlib.sha256(contents[first]).hexdigest()] = '0'
+        stub.uploads['0'] = {'meta': {}, 'data': bytearray(contents[first][:half])}
+
+        client = DeliveryClient(f"http://127.0.0.1:{stub.server_address[1]}", **client_args)
+        queue = DeliveryQueue(client, workers=2)
+        start = time.perf_counter()
+        queue.submit('benchmark', list(contents))
+
+        # An unclamped Retry-After would sleep for an hour, so wait on a thread with a deadline
+        results = []
+        waiter = threading.Thread(target=lambda: results.extend(queue.wait()), daemon=True)
+        waiter.start()
+        waiter.join(30)
+        elapsed = time.perf_counter() - start
+    finally:
+        stub.shutdown()
+        stub.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if not results:
+        print(f"❌ Delivery still waiting after {elapsed:.0f}s, Retry-After was not clamped")
+        return False
+    print(f"Delivery of {files} x {size_mb} MB through the stub: {elapsed:.2f}s, {stub.stats}")
+    uploads = {upload['path']: upload for upload in results[0]['files']}
+    for path, content in contents.items():
+        upload = uploads[path]
+        if not upload['success']:
+            print(f"❌ Upload of {os.path.basename(path)} failed: {upload['error']}")
+            return False
+        if bytes(stub.uploads[upload['id']]['data']) != content:
+            print(f"❌ {os.path.basename(path)} arrived corrupted")
+            return False
+    if uploads[first]['resumed_from'] != half:
+        print(f"❌ Interrupted upload restarted from {uploads[first]['resumed_from']} instead of {half}")
+        return False
+    if not stub.stats['failed'] or not stub.stats['conflicts'] or not stub.stats['throttled']:
+        print("❌ Stub faults were not exercised")
+        return False
+    return True
+
+
+def import_time(runs=5):
+    """Per-run ms of `import autopilot` under -X importtime, and any heavy modules it loaded"""
+    samples = []
+    heavy = set()
+    for _ in range(runs):
+        stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import autopilot'],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stderr
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            if name.split('.')[0] in HEAVY_MODULES:
+                heavy.add(name.split('.')[0])
+            if name == 'autopilot':
+                samples.append(int(cumulative) / 1000)
+    return samples, sorted(heavy)
+
+
+def benchmark_import_time():
+    """Fail if importing autopilot pulls in NumPy, OpenCV or MoviePy"""
+    samples, heavy = import_time()
+    print(f"Import time of autopilot: p50 {np.percentile(samples, 50):.1f} ms over {len(samples)} runs")
+    if heavy:
+        print(f"❌ import autopilot eagerly loads {', '.join(heavy)}")
+        return False
+    return True
+
+
+def frame_stats(samples_ms, peak_mb=None):
+    """Throughput, latency percentiles and peak memory of per-frame timings"""
+    samples = np.array(samples_ms)
+    return {
+        'frames': len(samples),
+        'fps': round(1000 / samples.mean(), 1),
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p90_ms': round(float(np.percentile(samples, 90)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+        'peak_mb': peak_mb
+    }
+
+
+def traced_peak_mb(run):
+    """Peak traced allocation (numpy buffers included) while calling run()"""
+    tracemalloc.start()
+    try:
+        run()
+        return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    finally:
+        tracemalloc.stop()
+
+
+def measure_frames(setup, times):
+    """Per-frame latencies of the make_frame returned by setup(), and the peak memory of a run"""
+    make_frame = setup()
+    samples = []
+    for t in times:
+        start = time.perf_counter()
+        make_frame(t)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    # Separate pass, tracemalloc slows allocation-heavy code down
+    def traced():
+        make_frame = setup()
+        for t in times[:10]:
+            make_frame(t)
+    return frame_stats(samples, traced_peak_mb(traced))
+
+
+def scratch_system(workdir, width, height, duration):
+    """A system writing into workdir at the given size, with the render and audio caches off"""
+    system = ViralLegalShortsSystem()
+    system.video_config.update(width=width, height=height, duration=duration, render_cache_mb=0)
+    system.output_dir = os.path.join(workdir, "output")
+    system.video_dir = os.path.join(system.output_dir, "videos")
+    system.audio_dir = os.path.join(system.output_dir, "audio")
+    system.thumbnail_dir = os.path.join(system.output_dir, "thumbnails")
+    system.logs_dir = os.path.join(workdir, "logs")
+    for directory in [system.video_dir, system.audio_dir, system.thumbnail_dir, system.logs_dir]:
+        os.makedirs(directory, exist_ok=True)
+    system.render_cache = RenderCache(system.output_dir, [system.video_dir], 0)
+    system.audio_cache = AudioCache(system.audio_dir, 0)
+    system.retention = RetentionManager(system.output_dir, system.logs_dir)
+    return system
+
+
+def environment():
+    """Machine and library versions a baseline was recorded with"""
+    try:
+        ffmpeg = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True).stdout.split('\n')[0]
+    except FileNotFoundError:
+        ffmpeg = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'ffmpeg': ffmpeg,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+
+def measure_pipeline(width, height, duration):
+    """Wall-clock time and peak memory of one full generate_video render"""
+    workdir = tempfile.mkdtemp(prefix='benchmark_pipeline_')
+    try:
+        system = scratch_system(workdir, width, height, duration)
+        start = time.perf_counter()
+        result = system.generate_video("consumer_rights", 0, write_log=False)
+        seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if not result['success']:
+        raise RuntimeError(f"pipeline render failed: {result.get('error')}")
+
+    # Producers overlap the encoder, so the stages add up to more than the render took
+    profile = result['log']['profile']
+    total_frames = duration * system.video_config['fps']
+    return {
+        'frames': total_frames,
+        'fps': round(total_frames / seconds, 1),
+        'mean_ms': round(seconds * 1000 / total_frames, 3),
+        'seconds': round(seconds, 3),
+        'peak_mb': peak_rss_mb(),
+        'encoder_peak_mb': peak_rss_mb('children'),
+        'stages': {name: stage['wall_seconds'] for name, stage in profile['stages'].items()}
+    }
+
+
+def pipeline_row(width, height, duration):
+    """measure_pipeline in a fresh interpreter, so its peak is not inherited from earlier rows"""
+    stdout = subprocess.run([sys.executable, os.path.abspath(__file__), '--pipeline-row', f"{width}x{height}",
+                             '--durations', str(duration)], capture_output=True, text=True, check=True).stdout
+    return json.loads(stdout.splitlines()[-1])
+
+
+def run_suite(resolutions, durations, frames=60, pipeline=True):
+    """Benchmark every frame generator, narration and the full pipeline"""
+    samples, heavy = import_time()
+    results = {'import/autopilot': frame_stats(samples)}
+    results['import/autopilot'].pop('fps')
+    results['import/autopilot']['heavy_modules'] = heavy
+    workdir = tempfile.mkdtemp(prefix='benchmark_')
+    try:
+        for width, height in resolutions:
+            for duration in durations:
+                system = scratch_system(workdir, width, height, duration)
+                fps = system.video_config['fps']
+                content_data = system.get_content_data("consumer_rights", 0)
+                main_duration = duration - 3
+                times = list(np.linspace(0, main_duration, frames, endpoint=False))
+                suffix = f"@{width}x{height}/{duration}s"
+                print(f"Suite {width}x{height}, {duration}s, {frames} frames per generator")
+
+                for theme in THEMES:
+                    def background():
+                        system.frame_cache = FrameCache(system.video_config['frame_cache_mb'])
+                        return system.create_animated_background(theme, main_duration).get_frame
+                    results[f"background/{theme}{suffix}"] = measure_frames(background, times)
+
+                def text_overlay():
+                    system.caption_cache.clear()
+                    system.create_text_overlay(content_data['script'], main_duration)
+                    backdrop = np.zeros((height, width, 3), dtype=np.uint8)
+                    backdrop.flags.writeable = False
+                    sprites = system.caption_sprites(content_data['script'], main_duration)
+                    return LayerCompositor(lambda t, out=None: backdrop, sprites, width, height).make_frame
+                results[f"text_overlay{suffix}"] = measure_frames(text_overlay, times)
+
+                title_times = list(np.linspace(0, 3, min(frames, 3 * fps), endpoint=False))
+                results[f"title_card{suffix}"] = measure_frames(
+                    lambda: system.create_title_card(content_data['title']).get_frame, title_times)
+
+                def narration():
+                    system.audio_cache = AudioCache(system.audio_dir, 0)
+                    system.create_narration_audio(content_data['script'], duration).close()
+                samples = []
+                for _ in range(5):
+                    start = time.perf_counter()
+                    narration()
+                    samples.append((time.perf_counter() - start) * 1000)
+                results[f"narration{suffix}"] = frame_stats(samples, traced_peak_mb(narration))
+                results[f"narration{suffix}"].pop('fps')
+
+                if pipeline:
+                    results[f"pipeline{suffix}"] = pipeline_row(width, height, duration)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for name, stats in results.items():
+        latency = f"p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms" if 'p50_ms' in stats else \
+            f"{stats['seconds']:7.2f} s total{'':13}"
+        rate = f"{stats['fps']:7.1f} fps" if 'fps' in stats else f"{'':11}"
+        print(f"  {name:<40} {rate}  {latency}  peak {stats['peak_mb']} MB")
+    return {'environment': environment(), 'peak_rss_mb': peak_rss_mb(), 'results': results}
+
+
+def compare(baseline, current, threshold):
+    """Names of benchmarks whose latency or memory regressed beyond threshold"""
+    regressions = []
+    print(f"Comparison against baseline from {baseline['environment']['timestamp']} "
+          f"(regression threshold {threshold:.0%})")
+    for key in ('python', 'numpy', 'opencv', 'ffmpeg', 'cpus'):
+        if baseline['environment'].get(key) != current['environment'].get(key):
+            print(f"⚠️ {key} differs from the baseline: {baseline['environment'].get(key)} -> "
+                  f"{current['environment'].get(key)}")
+
+    for name, stats in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"  {name:<40} new, no baseline")
+            continue
+        changes = []
+        for metric in ('p50_ms', 'p99_ms', 'mean_ms', 'seconds', 'peak_mb'):
+            if stats.get(metric) is None or not reference.get(metric):
+                continue
+            change = stats[metric] / reference[metric] - 1
+            changes.append(f"{metric} {change:+.1%}")
+            # Tail and mean latency are noisy on short runs, only the typical and whole-render cost and memory gate;
+            # sub-50us differences are timer jitter
+            noise = 0.05 if metric.endswith('_ms') else 0.0
+            if metric in GATED_METRICS and change > threshold and stats[metric] - reference[metric] > noise \
+                    and name not in regressions:
+                regressions.append(name)
+        status = "❌" if name in regressions else "  "
+        print(f"{status}{name:<40} {'  '.join(changes)}")
+    return regressions
+
+
+def parse_resolutions(value):
+    """Parse 'WxH,WxH' into (width, height) pairs"""
+    return [tuple(int(n) for n in item.lower().split('x')) for item in value.split(',')]
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Rendering benchmarks")
+    parser.add_argument('frames', nargs='?', type=int, default=60, help="Frames per generator")
+    parser.add_argument('--suite', action='store_true', help="Run the throughput and memory suite")
+    parser.add_argument('--resolutions', type=parse_resolutions, default=parse_resolutions("540x960,1080x1920"))
+    parser.add_argument('--durations', default="15", help="Comma-separated video durations in seconds")
+    parser.add_argument('--no-pipeline', action='store_true', help="Skip the full generate_video render")
+    parser.add_argument('--save', help="Write suite results to this JSON baseline")
+    parser.add_argument('--compare', help="Compare suite results with this JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Allowed slowdown before flagging")
+    parser.add_argument('--pipeline-row', type=parse_resolutions, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main():
+    """Run rendering benchmarks"""
+    args = parse_args()
+    if args.pipeline_row:
+        # Child of pipeline_row: the JSON row goes on the last line of stdout
+        (width, height), = args.pipeline_row
+        print(json.dumps(measure_pipeline(width, height, int(args.durations))))
+        return
+    if args.suite or args.save or args.compare:
+        durations = [int(d) for d in args.durations.split(',')]
+        current = run_suite(args.resolutions, durations, args.frames, not args.no_pipeline)
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(current, f, indent=2)
+            print(f"💾 Baseline written to {args.save}")
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            regressions = compare(baseline, current, args.threshold)
+            if current['results']['import/autopilot']['heavy_modules'] and 'import/autopilot' not in regressions:
+                regressions.append('import/autopilot')
+            if regressions:
+                print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+                sys.exit(1)
+            print("✅ No regressions against the baseline")
+        return
+
+    frames = args.frames
+    if not benchmark_import_time():
+        sys.exit(1)
+    if not benchmark_background(frames):
+        sys.exit(1)
+    benchmark_frame_cache()
+    benchmark_title_card()
+    if not benchmark_narration():
+        sys.exit(1)
+    if not benchmark_delivery():
+        sys.exit(1)
+    print("✅ Benchmarks completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import json
+import sqlite3
+
+import pytest
+
+from autopilot import ContentStore
+
+
+def make_record(**fields):
+    record = {
+        'topic': 'miranda_rights',
+        'variation': 1,
+        'title': 'Know Your Miranda Rights',
+        'script': 'You have the right to remain silent.',
+        'key_facts': ['Police must read them before custodial questioning'],
+        'date': '2024-01-15'
+    }
+    record.update(fields)
+    return {field: value for field, value in record.items() if value is not None}
+
+
+def write_json(tmp_path, records):
+    path = tmp_path / "topics.json"
+    path.write_text(json.dumps({'scripts': records}))
+    return str(path)
+
+
+def test_valid_records_are_indexed_by_topic_and_date(tmp_path):
+    store = ContentStore(write_json(tmp_path, [make_record(variation=2), make_record(date='2024-01-16')]))
+
+    assert store.variations['miranda_rights'] == [1, 2]
+    assert store.get('miranda_rights', 1)['title'] == 'Know Your Miranda Rights'
+    assert store.by_date == {'2024-01-15': ('miranda_rights', 2), '2024-01-16': ('miranda_rights', 1)}
+
+
+@pytest.mark.parametrize('record, message', [
+    ('not a record', "record is not an object"),
+    (make_record(title=None), "'title' must be a non-empty str"),
+    (make_record(title=''), "'title' must be a non-empty str"),
+    (make_record(variation='1'), "'variation' must be a non-empty int"),
+    (make_record(variation=True), "'variation' must be a non-empty int"),
+    (make_record(key_facts='one fact'), "'key_facts' must be a non-empty list"),
+    (make_record(key_facts=[]), "'key_facts' must be a non-empty list"),
+    (make_record(script='   \n '), "'script' has no words"),
+    (make_record(date='15/01/2024'), "'date' must be YYYY-MM-DD"),
+    (make_record(date=20240115), "'date' must be YYYY-MM-DD"),
+])
+def test_invalid_records_are_rejected_by_name(tmp_path, record, message):
+    path = write_json(tmp_path, [make_record(variation=2), record])
+
+    with pytest.raises(ValueError) as error:
+        ContentStore(path)
+
+    assert str(error.value) == f"{path}: scripts[1]: {message}"
+
+
+def test_variation_zero_is_valid(tmp_path):
+    store = ContentStore(write_json(tmp_path, [make_record(variation=0, date=None)]))
+
+    assert store.variations['miranda_rights'] == [0]
+
+
+def test_duplicate_variations_and_dates_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match=r"duplicate topic/variation \('miranda_rights', 1\)"):
+        ContentStore(write_json(tmp_path, [make_record(date=None), make_record(date=None)]))
+    with pytest.raises(ValueError, match=r"2024-01-15 is already scheduled for \('miranda_rights', 1\)"):
+        ContentStore(write_json(tmp_path, [make_record(), make_record(variation=2)]))
+
+
+def test_jsonl_errors_name_the_line(tmp_path):
+    path = tmp_path / "scripts.jsonl"
+    path.write_text(json.dumps(make_record()) + '\n\n' + json.dumps(make_record(variation=2, script='')) + '\n')
+
+    with pytest.raises(ValueError, match=rf"^{path}:3: 'script' must be a non-empty str$"):
+        ContentStore(str(path))
+
+    path.write_text(json.dumps(make_record()) + '\n{"topic": \n')
+    with pytest.raises(ValueError, match=rf"^{path}:2: "):
+        ContentStore(str(path))
+
+
+def test_lazy_jsonl_validates_content_on_first_use(tmp_path):
+    path = tmp_path / "scripts.jsonl"
+    path.write_text(json.dumps(make_record()) + '\n' + json.dumps(make_record(variation=2, date=None)) + '\n')
+    store = ContentStore(str(path), lazy=True)
+
+    assert store.stats()['loaded'] == 0
+    assert store.get('miranda_rights', 2)['script'] == 'You have the right to remain silent.'
+    assert store.stats()['loaded'] == 1
+
+
+def make_sqlite(tmp_path, rows, date_column=True):
+    path = str(tmp_path / "scripts.db")
+    columns = "topic TEXT, variation INTEGER, title TEXT, script TEXT, key_facts TEXT"
+    with sqlite3.connect(path) as db:
+        db.execute(f"CREATE TABLE scripts ({columns}{', date TEXT' if date_column else ''})")
+        for row in rows:
+            values = [row['topic'], row['variation'], row['title'], row['script'], row['key_facts']]
+            if date_column:
+                values.append(row.get('date'))
+            db.execute(f"INSERT INTO scripts VALUES ({', '.join('?' * len(values))})", values)
+    return path
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_sqlite_without_a_date_column(tmp_path, lazy):
+    record = make_record(key_facts=json.dumps(['A fact']), date=None)
+    store = ContentStore(make_sqlite(tmp_path, [record], date_column=False), lazy=lazy)
+
+    assert store.get('miranda_rights', 1)['key_facts'] == ['A fact']
+    assert store.by_date == {}
+
+
+def test_lazy_sqlite_reports_bad_rows_when_loaded(tmp_path):
+    store = ContentStore(make_sqlite(tmp_path, [make_record(key_facts='not json')]), lazy=True)
+
+    with pytest.raises(ValueError, match=r"row 1: 'key_facts' must be a non-empty list"):
+        store.get('miranda_rights', 1)
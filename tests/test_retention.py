@@ -0,0 +1,158 @@
+import json
+import os
+import time
+
+import pytest
+
+from autopilot import RetentionManager
+
+
+@pytest.fixture
+def retention(tmp_path):
+    output_dir = tmp_path / "output"
+    logs_dir = tmp_path / "logs"
+    output_dir.mkdir()
+    logs_dir.mkdir()
+    return RetentionManager(str(output_dir), str(logs_dir))
+
+
+def write_file(path, size=100, age=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    if age:
+        then = time.time() - age
+        os.utime(path, (then, then))
+    return path
+
+
+def record_render(retention, render_key, kinds=('video', 'thumbnail', 'marketing')):
+    paths = {kind: write_file(os.path.join(retention.output_dir, kind, f"{render_key}.bin")) for kind in kinds}
+    retention.record(render_key, 'miranda_rights', 1, **paths)
+    return paths
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_log_rotates_past_the_size_cap(tmp_path):
+    retention = RetentionManager(str(tmp_path), str(tmp_path), log_mb=200 / (1024 * 1024), log_backups=2)
+    for n in range(20):
+        retention.log_run('video', {'n': n})
+
+    log = retention.run_log_path
+    assert os.path.exists(log + '.1') and os.path.exists(log + '.2')
+    assert not os.path.exists(log + '.3')
+    for path in (log, log + '.1', log + '.2'):
+        assert os.path.getsize(path) <= retention.max_log_bytes
+
+    # The newest runs stay in runs.jsonl and older ones shift down without gaps
+    kept = read_lines(log + '.2') + read_lines(log + '.1') + read_lines(log)
+    assert [entry['n'] for entry in kept] == list(range(kept[0]['n'], 20))
+    assert all(entry['type'] == 'video' for entry in kept)
+
+
+def test_rotation_without_backups_starts_a_fresh_log(tmp_path):
+    retention = RetentionManager(str(tmp_path), str(tmp_path), log_mb=100 / (1024 * 1024), log_backups=0)
+    for n in range(10):
+        retention.log_run('error', {'n': n})
+
+    assert not os.path.exists(retention.run_log_path + '.1')
+    assert read_lines(retention.run_log_path)[-1]['n'] == 9
+
+
+def test_index_replays_the_latest_line_per_render(retention):
+    record_render(retention, 'aaaa')
+    record_render(retention, 'bbbb')
+    with open(retention.index_path, 'a') as f:
+        f.write(json.dumps({'render_key': 'bbbb', 'removed': True}) + '\n')
+        f.write('{"render_key": "torn')  # Interrupted mid-write
+
+    reloaded = RetentionManager(retention.output_dir, retention.logs_dir)
+    assert set(reloaded.load()) == {'aaaa'}
+    assert reloaded.lookup('bbbb') is None
+
+
+def test_prune_compacts_the_index(retention):
+    first = record_render(retention, 'aaaa')['video']
+    created = retention.lookup('aaaa')
+    record_render(retention, 'aaaa')  # A cache hit appends a superseding line
+    record_render(retention, 'bbbb')
+    assert len(read_lines(retention.index_path)) == 3
+
+    result = retention.prune(max_age_days=0)
+
+    assert result['renders'] == 0
+    assert [entry['render_key'] for entry in read_lines(retention.index_path)] == ['aaaa', 'bbbb']
+    assert not os.path.exists(retention.index_path + '.partial')
+    assert os.path.exists(first)
+    reloaded = RetentionManager(retention.output_dir, retention.logs_dir)
+    assert reloaded.lookup('aaaa') == created
+
+
+def test_prune_drops_renders_the_cache_evicted(retention):
+    evicted = record_render(retention, 'aaaa')
+    kept = record_render(retention, 'bbbb')
+    os.remove(evicted['video'])  # What RenderCache.evict does to a least recently used video
+
+    result = retention.prune(max_age_days=0)
+
+    assert result['renders'] == 1
+    assert result['files'] == 2
+    assert not any(os.path.exists(path) for path in evicted.values())
+    assert all(os.path.exists(path) for path in kept.values())
+    assert [entry['render_key'] for entry in read_lines(retention.index_path)] == ['bbbb']
+
+
+def test_prune_keeps_marketing_only_renders(retention):
+    marketing = record_render(retention, 'aaaa', kinds=('marketing',))['marketing']
+
+    assert retention.prune(max_age_days=0)['renders'] == 0
+    assert os.path.exists(marketing)
+
+
+def test_prune_expires_unused_renders(retention):
+    paths = record_render(retention, 'aaaa')
+    retention.entries['aaaa']['used'] -= 31 * 86400
+
+    assert retention.prune(max_age_days=30)['renders'] == 1
+    assert not any(os.path.exists(path) for path in paths.values())
+    assert read_lines(retention.index_path) == []
+
+
+def test_prune_sweeps_stale_intermediates_and_partials(retention, tmp_path):
+    audio_dir = str(tmp_path / "output" / "audio")
+    video_dir = str(tmp_path / "output" / "videos")
+    stale_wav = write_file(os.path.join(audio_dir, "narration_old.wav"), age=8 * 86400)
+    fresh_wav = write_file(os.path.join(audio_dir, "narration_new.wav"))
+    stale_partial = write_file(os.path.join(video_dir, "legal_short.partial.mp4"), age=25 * 3600)
+    fresh_partial = write_file(os.path.join(video_dir, "other.partial.mp4"))
+
+    retention.prune(max_age_days=30, intermediate_dirs=[audio_dir], intermediate_days=7,
+                    sweep_dirs=[video_dir], partial_hours=24)
+
+    assert not os.path.exists(stale_wav) and not os.path.exists(stale_partial)
+    assert os.path.exists(fresh_wav) and os.path.exists(fresh_partial)
+
+
+def test_compact_legacy_logs_folds_per_run_files_oldest_first(retention):
+    legacy = [
+        ('success_log_20240102_090000.json', {'topic': 'miranda_rights'}),
+        ('error_log_20240101_090000.json', {'error': 'boom'}),
+        ('batch_manifest_20240103_090000.json', {'jobs': 2}),
+    ]
+    for name, entry in legacy:
+        with open(os.path.join(retention.logs_dir, name), 'w') as f:
+            json.dump(entry, f)
+    with open(os.path.join(retention.logs_dir, 'success_log_20240104_090000.json'), 'w') as f:
+        f.write('{not json')
+
+    assert retention.compact_legacy_logs() == 3
+
+    lines = read_lines(retention.run_log_path)
+    assert [line['type'] for line in lines] == ['error', 'video', 'batch']
+    assert lines[1]['topic'] == 'miranda_rights'
+    # Unreadable files stay behind for a human to look at
+    assert sorted(os.listdir(retention.logs_dir)) == ['runs.jsonl', 'success_log_20240104_090000.json']